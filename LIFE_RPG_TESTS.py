@@ -6,7 +6,15 @@ This file demonstrates how to use the system programmatically
 and can be used for quick testing of individual features.
 """
 
-from life_rpg_game_master import GameEngine, CLIInterface, Difficulty, QuestType
+from life_rpg_game_master import GameEngine, CLIInterface, Difficulty, QuestType, GameEvent
+from life_rpg_leaderboard import Leaderboard
+from life_rpg_analytics import AnalyticsPipeline
+from life_rpg_scheduler import ExpiryScheduler
+from life_rpg_timeseries import TimeSeriesStore, TimeSeriesRecorder
+from life_rpg_loadgen import Trace, CLIPool, synthesize, replay
+from life_rpg_game_master import GameConfig
+from life_rpg_balance import grid, main as balance_main, run_sweep, summary_table
+from life_rpg_battle import Arena, Combatant, resolve_battle
 import json
 
 
@@ -216,6 +224,581 @@ def test_complex_scenario():
     print(f"  Current Streak: {final_player.missed_quests_streak}")
 
 
+def test_leaderboard():
+    """Test incremental leaderboard rankings."""
+    print_section("TEST 8: Leaderboard")
+    
+    board = Leaderboard()
+    engines = [GameEngine(name) for name in ("Ava", "Ben", "Cid", "Dee")]
+    for engine in engines:
+        board.attach(engine)
+    
+    # Ben completes 2 quests, Cid 1, Dee misses one
+    engines[1].complete_quest("q0")
+    engines[1].complete_quest("q1")
+    engines[2].complete_quest("q0")
+    engines[3].miss_quest("q0")
+    
+    print("Top 3 by total XP:")
+    for entry in board.top("total_xp", 3):
+        print(f"  #{entry['rank']} {entry['player_id']}: {entry['score']} XP")
+    
+    print(f"\nBen's streak rank: {board.rank_of('streak', 'Ben')} (expected: 1)")
+    print(f"Dee's XP rank: {board.rank_of('total_xp', 'Dee')} (expected: 4)")
+    print(f"Around Cid: {[e['player_id'] for e in board.around('total_xp', 'Cid', 1)]}")
+    assert board.rank_of("streak", "Ben") == 1
+    assert board.rank_of("total_xp", "Dee") == 4
+
+
+def test_analytics():
+    """Test streaming analytics aggregation."""
+    print_section("TEST 9: Analytics Pipeline")
+    
+    exports = []
+    pipeline = AnalyticsPipeline(window_days=7, exporter=exports.append, export_every=5)
+    engines = [GameEngine(f"Player{i}") for i in range(5)]
+    for engine in engines:
+        pipeline.attach(engine)
+    
+    # Play 10 days: even players complete everything, odd players skip
+    for day in range(10):
+        for i, engine in enumerate(engines):
+            if i % 2 == 0:
+                for q in list(engine.game_state.active_quests):
+                    if not q.completed and not q.missed:
+                        engine.complete_quest(q.quest_id)
+            engine.next_day()
+    
+    week = pipeline.weekly(0)
+    print(f"Week 1 completions: {week['completions']}")
+    print(f"Week 1 misses: {week['misses']}")
+    print(f"Week 1 fatigue activation rate: {week['fatigue_activation_rate']:.2f}")
+    print(f"XP p50/p99: {pipeline.percentile('xp', 50):.1f} / {pipeline.percentile('xp', 99):.1f}")
+    print(f"Days retained: {len(pipeline.to_dict()['days'])} (expected: <= 7)")
+    # 10 game days closed by 5 players: export_every counts days, not players
+    print(f"Exports: {len(exports)} (expected: 2)")
+    assert len(pipeline.to_dict()["days"]) <= 7
+    assert len(exports) == 2
+    
+    # State is keyed by player id, not by engine object identity
+    pipeline.detach("Player0")
+    print(f"Level-up history dropped on detach: "
+          f"{'Player0' not in pipeline._level_days} (expected: True)")
+    assert "Player0" not in pipeline._level_days and "Player2" in pipeline._level_days
+
+
+def test_instrumentation():
+    """Test opt-in instrumentation and hooks."""
+    print_section("TEST 10: Instrumentation & Hooks")
+    
+    cli = CLIInterface("Profiler", instrument=True)
+    level_ups = []
+    cli.engine.on(GameEvent.LEVEL_UP, level_ups.append)
+    
+    for cmd in ["status", "quests", "quest_complete q0", "quest_complete q4",
+                "quest_miss q1", "next_day", "bogus"]:
+        cli.handle_command(cmd)
+    
+    stats = json.loads(cli.handle_command("stats"))
+    print(f"Commands recorded: {sorted(stats['commands'])}")
+    print(f"Quests scanned: {stats['quests_scanned']}")
+    print(f"Buffs evaluated: {stats['buffs_evaluated']}")
+    print(f"JSON bytes produced: {stats['json_bytes']}")
+    print(f"Level-up hook fired: {len(level_ups)} time(s) (boss quest = 150 XP)")
+    assert "unknown" in stats["commands"]
+    assert level_ups
+    
+    disabled = json.loads(CLIInterface("Plain").handle_command("stats"))
+    print(f"Disabled CLI reports enabled={disabled['instrumentation_enabled']}")
+
+
+def test_fast_startup():
+    """Test lazy engine construction and the prefork worker."""
+    print_section("TEST 11: Lazy Startup & Prefork Worker")
+    
+    cli = CLIInterface("Lazy")
+    print(f"Engine built before first command: {cli._engine is not None} (expected: False)")
+    cli.handle_command("status")
+    print(f"Engine built after first command: {cli._engine is not None} (expected: True)")
+    
+    import os
+    if not hasattr(os, "fork"):
+        print("os.fork unavailable - skipping prefork worker")
+        return
+    from life_rpg_worker import PreforkWorker
+    worker = PreforkWorker("Forked")
+    first = json.loads(worker.handle("quest_complete q0"))
+    again = json.loads(worker.handle("quest_complete q0"))
+    print(f"Each forked request starts fresh: {first['success'] and again['success']} (expected: True)")
+    assert first["success"] and again["success"]
+
+
+def test_cacheable_responses():
+    """Test ETag-based conditional status responses."""
+    print_section("TEST 12: Cacheable Status Responses")
+    
+    cli = CLIInterface("Poller")
+    first = cli.handle_command("status")
+    second = cli.handle_command("status")
+    etag = json.loads(first)["etag"]
+    print(f"Identical polls return identical responses: {first == second} (expected: True)")
+    print(f"Timestamp included by default: {'timestamp' in json.loads(first)} (expected: False)")
+    
+    not_modified = json.loads(cli.handle_command(f"status {etag}"))
+    print(f"Poll with current ETag: {not_modified}")
+    
+    cli.handle_command("quest_complete q0")
+    changed = json.loads(cli.handle_command(f"status {etag}"))
+    print(f"After a mutation the ETag changes: {changed['etag'] != etag} (expected: True)")
+    assert first == second and not_modified["not_modified"]
+    assert changed["etag"] != etag
+    
+    stamped = json.loads(CLIInterface("Stamped", include_timestamp=True).handle_command("status"))
+    print(f"Opt-in timestamp: {stamped['timestamp']}")
+
+
+def test_calendar_mode():
+    """Test lazy calendar-driven day advancement."""
+    print_section("TEST 13: Calendar Mode")
+    
+    from datetime import date, timedelta
+    today = [date(2024, 1, 1)]
+    engine = GameEngine("Commuter", start_date=date(2024, 1, 1), clock=lambda: today[0])
+    
+    print(f"Day on start date: {engine.get_player_status()['current_day']} (expected: 1)")
+    print(f"Explicit next_day: {engine.next_day()['error']}")
+    
+    # Player disappears for three weeks; nothing happens until touched
+    today[0] += timedelta(days=21)
+    print(f"Untouched while away: day {engine.game_state.player.current_day} (expected: 1)")
+    status = engine.get_status()
+    print(f"After returning: day {status['player']['current_day']} (expected: 22)")
+    print(f"Missed streak after absence: {status['player']['missed_quests_streak']}")
+    assert status["player"]["current_day"] == 22
+    
+    cli = CLIInterface("Commuter")
+    cli.engine = engine
+    etag = json.loads(cli.handle_command("status"))["etag"]
+    today[0] += timedelta(days=1)
+    print(f"Cached status refreshed by rollover: {json.loads(cli.handle_command('status'))['etag'] != etag} (expected: True)")
+    
+    # Undo cannot reach back across a clock rollover
+    engine.complete_quest(engine.get_active_quests()["quests"][-1]["quest_id"])
+    today[0] += timedelta(days=3)
+    result = engine.undo()
+    print(f"Undo after a rollover: {result.get('error')} "
+          f"(day {engine.game_state.player.current_day}, expected: 26)")
+    assert not result["success"] and engine.game_state.player.current_day == 26
+    
+    # A two-year absence is caught up in one step, not 730 rollovers
+    import time
+    away = GameEngine("Drifter", seed=3, start_date=date(2024, 1, 1), clock=lambda: today[0])
+    stepped = GameEngine("Drifter", seed=3)
+    today[0] = date(2024, 1, 1) + timedelta(days=730)
+    started = time.perf_counter()
+    player = away.get_player_status()
+    elapsed = time.perf_counter() - started
+    for _ in range(730):
+        stepped._advance_day()
+    print(f"Catch-up after 730 days: {elapsed * 1000:.2f} ms, "
+          f"{len(away.game_state.active_quests)} quests (day {player['current_day']}, expected: 731)")
+    assert player["current_day"] == 731 and elapsed < 0.05
+    assert len(away.game_state.active_quests) < 20
+    expected = stepped.game_state.player
+    for key in ("xp", "total_xp_earned", "missed_quests_streak", "stats"):
+        assert getattr(away.game_state.player, key) == getattr(expected, key), key
+    assert [(b.duration_days, b.applied_date) for b in away.game_state.player.active_buffs
+            if b.buff_type.value == "fatigue"] == \
+        [(b.duration_days, b.applied_date) for b in expected.active_buffs
+         if b.buff_type.value == "fatigue"]
+
+
+def test_expiry_scheduler():
+    """Test timing-wheel driven quest deadlines and buff expiries."""
+    print_section("TEST 14: Expiry Scheduler")
+    
+    scheduler = ExpiryScheduler(start_day=1)
+    engines = [GameEngine(f"Wheel{i}") for i in range(3)]
+    for engine in engines:
+        scheduler.attach(engine)
+    print(f"Timers after attach: {len(scheduler.wheel)} (expected: 15)")
+    
+    engines[0].complete_quest("q0")
+    engines[0].miss_quest("q1")
+    engines[0].miss_quest("q2")  # Fatigue for 3 days
+    print(f"Timers after 1 complete + 2 misses + fatigue: {len(scheduler.wheel)} (expected: 13)")
+    
+    result = engines[0].next_day()
+    print(f"Engine 0 auto-missed: {result['incomplete_quests_auto_missed']} (expected: 1)")
+    print(f"Engine 1 quests missed by the shared tick: "
+          f"{sum(q.missed for q in engines[1].game_state.active_quests)} (expected: 4)")
+    
+    # Complete everything so the fatigue is not re-triggered
+    for _ in range(2):
+        for q in list(engines[0].game_state.active_quests):
+            if not q.completed and not q.missed:
+                engines[0].complete_quest(q.quest_id)
+        engines[0].next_day()
+    fatigue = [b for b in engines[0].game_state.player.active_buffs if b.buff_type.value == "fatigue"]
+    print(f"Fatigue expired on day {engines[0].game_state.player.current_day}: {not fatigue} (expected: True)")
+    assert result["incomplete_quests_auto_missed"] == 1
+    assert not fatigue
+    
+    # The scheduler owns the day: an idle player rolls over with everyone
+    scheduler = ExpiryScheduler(start_day=1)
+    busy, idle = GameEngine("Busy", seed=1), GameEngine("Idle", seed=2)
+    scheduler.attach(busy)
+    scheduler.attach(idle)
+    idle.miss_quest("q0")
+    idle.miss_quest("q1")  # Fatigue for 3 days
+    open_counts = []
+    for _ in range(5):
+        busy.next_day()
+        open_counts.append(sum(not q.completed and not q.missed
+                               for q in idle.game_state.active_quests))
+    print(f"\nIdle player's day after 5 shared days: {idle.game_state.player.current_day} "
+          f"(expected: {scheduler.day})")
+    print(f"Idle player's open quests per day: {open_counts} (expected: bounded)")
+    assert idle.game_state.player.current_day == scheduler.day == 6
+    assert max(open_counts[1:]) <= 5
+    
+    buff = idle.apply_random_powerup()
+    shown = idle.get_player_status()["active_buffs"][-1]["duration_days"]
+    scheduler.next_day()
+    print(f"Power-up remaining duration: {shown} day(s), "
+          f"active next day: {buff in idle.game_state.player.active_buffs} (expected: 1, False)")
+    assert shown == 1 and buff not in idle.game_state.player.active_buffs
+    try:
+        scheduler.wheel.schedule_at(scheduler.day, print)
+        raise AssertionError("past deadline was accepted")
+    except ValueError as e:
+        print(f"Past deadlines rejected: {e}")
+    
+    # Attaching a scheduler does not change how long fatigue lasts
+    lifetimes = []
+    for scheduled in (False, True):
+        engine = GameEngine("Balance", seed=1)
+        if scheduled:
+            ExpiryScheduler(start_day=1).attach(engine)
+        days = []
+        for _ in range(6):
+            engine.next_day()  # idle: every open quest is auto-missed
+            if any(b.buff_type.value == "fatigue" for b in engine.game_state.player.active_buffs):
+                days.append(engine.game_state.player.current_day)
+        lifetimes.append(days)
+    print(f"Fatigue days without / with a scheduler: {lifetimes[0]} / {lifetimes[1]}")
+    assert lifetimes[0] == lifetimes[1]
+
+
+def test_time_series():
+    """Test per-day history recording and range queries."""
+    print_section("TEST 15: Time-Series Store")
+    
+    import tempfile
+    with tempfile.TemporaryDirectory() as root:
+        store = TimeSeriesStore(root)
+        recorder = TimeSeriesRecorder(store)
+        engine = GameEngine("Historian")
+        recorder.attach(engine)
+        
+        # 100 days, completing one quest per day
+        for _ in range(100):
+            engine.complete_quest(engine.game_state.active_quests[-1].quest_id)
+            engine.next_day()
+        
+        print(f"Days recorded: {store.count('Historian')} (expected: 100)")
+        week = store.read_range("Historian", 8, 14, ["day", "level", "completions"])
+        print(f"Days 8-14: {list(week['day'])}")
+        print(f"Levels: {list(week['level'])}")
+        print(f"Completions/day: {list(week['completions'])} (expected: all 1)")
+        monthly = store.downsample("Historian", "total_xp", 30, agg="last")
+        print(f"Total XP at end of each 30-day bucket: {monthly}")
+        assert store.count("Historian") == 100
+        assert list(week["completions"]) == [1] * 7
+        for view in week.values():
+            view.release()
+        store.close()
+        
+        # Restart: a fresh engine cannot overwrite history, and is told so at attach
+        store = TimeSeriesStore(root)
+        recorder = TimeSeriesRecorder(store)
+        try:
+            recorder.attach(GameEngine("Historian"))
+            raise AssertionError("stale engine was attached")
+        except ValueError as e:
+            print(f"\nReattach after restart: {e}")
+        
+        # A row the store already has never fails the engine's rollover
+        engine = GameEngine("Newcomer")
+        recorder.attach(engine)
+        store.append("Newcomer", TimeSeriesRecorder.row_for(engine.game_state.player, 5, 0, 0))
+        result = engine.next_day()
+        print(f"Rollover over existing history: success {result['success']}, "
+              f"rows skipped {recorder.rows_skipped} (expected: True, 1)")
+        assert result["success"] and recorder.rows_skipped == 1
+        store.close()
+
+
+def test_snapshots():
+    """Test copy-on-write preview and undo."""
+    print_section("TEST 16: Preview & Undo")
+    
+    engine = GameEngine("Planner", seed=7)
+    etag = engine.game_state.etag
+    boss = [q for q in engine.game_state.active_quests if q.quest_type == QuestType.WEEKLY_BOSS][0]
+    
+    preview = engine.preview("quest_complete", boss.quest_id)
+    print(f"Preview boss completion: +{preview['xp_awarded']} XP, "
+          f"would reach level {preview['would_reach_level']}")
+    print(f"State untouched by preview: {engine.game_state.etag == etag} (expected: True)")
+    print(f"Boss still open: {not engine._find_quest(boss.quest_id).completed} (expected: True)")
+    
+    # Mis-tapped miss, then undo
+    engine.miss_quest("q0")
+    print(f"\nAfter mis-tap: streak {engine.game_state.player.missed_quests_streak}, "
+          f"XP {engine.game_state.player.total_xp_earned}")
+    result = engine.undo()
+    print(f"After undo: streak {engine.game_state.player.missed_quests_streak}, "
+          f"XP {engine.game_state.player.total_xp_earned} (expected: 0, 0)")
+    print(f"q0 open again: {not engine._find_quest('q0').missed} (expected: True)")
+    print(f"Nothing left to undo: {engine.undo()['error']}")
+    assert engine.game_state.etag != etag
+    assert result["success"] and engine.game_state.player.missed_quests_streak == 0
+    
+    # Undoing next_day replays the same quests (generator state is restored)
+    engine.next_day()
+    rolled = [q.title for q in engine.game_state.active_quests]
+    engine.undo()
+    engine.next_day()
+    print(f"next_day after undo regenerates identical quests: "
+          f"{rolled == [q.title for q in engine.game_state.active_quests]} (expected: True)")
+    
+    # Event consumers reverse what an undo takes back
+    import tempfile
+    with tempfile.TemporaryDirectory() as root:
+        store = TimeSeriesStore(root)
+        recorder = TimeSeriesRecorder(store)
+        pipeline = AnalyticsPipeline()
+        engine = GameEngine("Rewinder", seed=7)
+        recorder.attach(engine)
+        pipeline.attach(engine)
+        engine.complete_quest("q0")
+        engine.undo()
+        engine.complete_quest("q0")
+        engine.next_day()
+        engine.undo()
+        engine.next_day()
+        day_one = pipeline.daily(1)
+        rows = store.read_range("Rewinder", columns=["day", "completions"])
+        print(f"Recorded days after next_day/undo/next_day: {list(rows['day'])} (expected: [1])")
+        print(f"Completions counted on day 1: recorder {list(rows['completions'])}, "
+              f"analytics {sum(day_one['completions'].values())} (expected: [1], 1)")
+        assert list(rows["day"]) == [1] and list(rows["completions"]) == [1]
+        assert sum(day_one["completions"].values()) == 1 and day_one["player_days"] == 1
+        for view in rows.values():
+            view.release()
+        store.close()
+
+
+def test_adaptive_difficulty():
+    """Test the per-player completion model steering daily quest difficulty."""
+    print_section("TEST 17: Adaptive Difficulty")
+    
+    def hard_share(engine, days, complete):
+        hard = total = 0
+        for _ in range(days):
+            day = engine.game_state.player.current_day
+            for quest in list(engine.game_state.active_quests):
+                if quest.quest_type != QuestType.DAILY or quest.created_day != day:
+                    continue
+                total += 1
+                hard += quest.difficulty == Difficulty.HARD
+                if complete:
+                    engine.complete_quest(quest.quest_id)
+            engine.next_day()
+        return hard / total
+    
+    struggling = GameEngine("Struggler", seed=3)
+    thriving = GameEngine("Achiever", seed=3)
+    uniform = GameEngine("Uniform", seed=3, adaptive_difficulty=False)
+    struggling_share = hard_share(struggling, 60, complete=False)
+    thriving_share = hard_share(thriving, 60, complete=True)
+    uniform_share = hard_share(uniform, 60, complete=False)
+    model = struggling.game_state.player.difficulty_model
+    
+    print(f"Struggling player completion rate: {model.overall_rate:.2f}, "
+          f"streak {model.recent_streak}")
+    print(f"Share of HARD daily quests - struggling: {struggling_share:.2f}, "
+          f"thriving: {thriving_share:.2f}, uniform: {uniform_share:.2f}")
+    assert struggling_share < uniform_share < thriving_share
+    assert thriving.game_state.player.difficulty_model.type_rates["daily"] > 0.9
+    
+    # The model travels with snapshots and round-trips through to_dict
+    engine = GameEngine("Tester", seed=5)
+    before = engine.game_state.player.difficulty_model.to_dict()
+    engine.miss_quest("q0")
+    engine.undo()
+    restored = engine.game_state.player.difficulty_model.to_dict()
+    print(f"Undo restores the model: {restored == before} (expected: True)")
+    assert restored == before
+    engine.complete_quest("q1")
+    saved = engine.game_state.player.to_persist_dict()["difficulty_model"]
+    print(f"Model saved with the player: daily rate {saved['type_rates']['daily']:.2f}")
+    assert type(engine.game_state.player.difficulty_model).from_dict(saved).to_dict() == saved
+    print(f"Model kept out of API responses: "
+          f"{'difficulty_model' not in engine.get_player_status()} (expected: True)")
+    assert "difficulty_model" not in engine.get_player_status()
+
+
+def test_load_generator():
+    """Test trace synthesis, JSONL round trip and replay."""
+    print_section("TEST 18: Load Generator")
+    
+    trace = synthesize(events=3000, players=50, skew=1.2, burstiness=0.6, rate=2000, seed=11)
+    again = synthesize(events=3000, players=50, skew=1.2, burstiness=0.6, rate=2000, seed=11)
+    per_player = {}
+    for event in trace.events:
+        per_player[event.player] = per_player.get(event.player, 0) + 1
+    print(f"Events: {len(trace.events)}, duration {trace.duration:.2f}s (expected: ~1.5s)")
+    print(f"Same seed, same trace: {trace.events == again.events} (expected: True)")
+    print(f"Busiest player: {per_player['player0']} events, "
+          f"quietest: {min(per_player.values())}")
+    assert trace.events == again.events
+    assert per_player["player0"] == max(per_player.values())
+    
+    import tempfile, os
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "trace.jsonl")
+        trace.save(path)
+        loaded = Trace.load(path)
+    print(f"JSONL round trip preserves commands: "
+          f"{[e.command for e in loaded.events] == [e.command for e in trace.events]} "
+          f"(expected: True)")
+    assert loaded.params == trace.params
+    
+    pool = CLIPool()
+    assert pool.cli_for("warmup")._engine is not None  # engines are never built while timed
+    pool = CLIPool()
+    report = replay(loaded, pool, rate=0)
+    print(f"Replayed {report.events} commands for {len(pool)} players "
+          f"at {report.throughput:.0f}/s")
+    print(f"Service latency: {report.service_us}")
+    completed = sum(cli.engine.game_state.player.total_xp_earned > 0 for cli in pool._clis.values())
+    print(f"Players who earned XP through resolved quest ids: {completed}")
+    assert report.events == 3000 and completed > 0
+    assert set(report.service_us) == {"p50", "p99", "p99.9", "max"}
+    
+    # Seeded engines make a replay a regression run: same trace, same outcome
+    def outcome(p):
+        return {key: (cli.engine.game_state.player.total_xp_earned,
+                      [q.title for q in cli.engine.game_state.active_quests])
+                for key, cli in p._clis.items()}
+    rerun_pool = CLIPool()
+    rerun = replay(loaded, rerun_pool, rate=0)
+    print(f"Replay seed {rerun.seed}: identical outcome {outcome(rerun_pool) == outcome(pool)} "
+          f"(expected: True)")
+    assert rerun.seed == report.seed == 0 and outcome(rerun_pool) == outcome(pool)
+    assert rerun.errors == report.errors and rerun.commands == report.commands
+
+
+def test_balance_config():
+    """Test injectable balance config and the cached sweep runner."""
+    print_section("TEST 19: Balance Config & Sweep")
+    
+    config = GameConfig(xp_per_level=50, fatigue_xp_penalty=0.5)
+    engine = GameEngine("Tuned", config=config)
+    boss = [q for q in engine.game_state.active_quests if q.quest_type == QuestType.WEEKLY_BOSS][0]
+    engine.complete_quest("q0")
+    engine.complete_quest(boss.quest_id)
+    earned = engine.game_state.player.total_xp_earned
+    player = engine.get_player_status()
+    print(f"Earned {earned} XP with xp_per_level=50: level {player['level']}, "
+          f"{player['xp_to_next_level']} XP to go (expected: {1 + earned // 50}, {50 - earned % 50})")
+    assert player["level"] == 1 + earned // 50
+    assert player["xp_to_next_level"] == 50 - earned % 50
+    engine.miss_quest("q2")
+    engine.miss_quest("q3")
+    print(f"XP for a 25 XP quest while fatigued: {engine._apply_buffs_to_xp(25)} (expected: 12.5)")
+    assert engine._apply_buffs_to_xp(25) == 12.5
+    assert GameConfig.from_dict(config.to_dict()) == config
+    assert config.config_hash() != GameConfig().config_hash()
+    assert hash(GameConfig()) == hash(GameConfig()) and len({config, GameConfig()}) == 2
+    status = balance_main(["--grid", "xp_per_level"])
+    print(f"Malformed --grid: exit {status} (expected: 1)")
+    assert status == 1
+    
+    import tempfile, os
+    with tempfile.TemporaryDirectory() as root:
+        cache = os.path.join(root, "cache.json")
+        configs = grid({"xp_per_level": [60, 100]})
+        rows = run_sweep(configs, ["diligent", "struggling"], days=21, seeds=1,
+                         workers=1, cache_path=cache)
+        print(summary_table(rows))
+        configs.append(GameConfig(fatigue_debuff_duration=5))
+        rerun = run_sweep(configs, ["diligent", "struggling"], days=21, seeds=1,
+                          workers=1, cache_path=cache)
+    print(f"\nRerun cache hits: {[row['cached'] for row in rerun]} (expected: True, True, False)")
+    assert [row["cached"] for row in rerun] == [True, True, False]
+    assert rerun[0]["results"] == rows[0]["results"]
+    slower = rows[1]["results"]["diligent"]["days_per_level"]
+    print(f"Diligent days/level: {rows[0]['results']['diligent']['days_per_level']} "
+          f"at 60 XP vs {slower} at 100 XP")
+    assert rows[0]["results"]["diligent"]["days_per_level"] < slower
+
+
+def test_battle_engine():
+    """Test stat-driven battles, batched resolution and exact replays."""
+    print_section("TEST 20: Battle Engine")
+    
+    veteran = GameEngine("Veteran", seed=1)
+    rookie = GameEngine("Rookie", seed=2)
+    veteran.game_state.player.stats.productivity = 90
+    veteran.game_state.player.stats.discipline = 80
+    rookie.game_state.player.stats.focus = 10
+    rookie.miss_quest("q0")
+    rookie.miss_quest("q1")  # fatigue weakens attack
+    fighter, weakling = (Combatant.from_player(e.game_state.player) for e in (veteran, rookie))
+    print(f"Veteran: {fighter.to_dict()}")
+    print(f"Rookie (fatigued): {weakling.to_dict()}")
+    assert fighter.attack > weakling.attack and fighter.defense > weakling.defense
+    
+    arena = Arena(seed=2024)
+    for _ in range(500):
+        arena.start(fighter, weakling)
+    results = arena.run()
+    wins = sum(r.winner == "a" for r in results)
+    print(f"\nVeteran won {wins}/500 batched matches")
+    assert wins > 400
+    
+    # A match replays identically on its own, regardless of its batch
+    disputed = results[137]
+    replayed = Arena.replay(disputed.to_dict())
+    print(f"Replay of match {disputed.match_id}: winner {replayed.winner_name}, "
+          f"{replayed.ticks} ticks, HP left {replayed.hp_left} "
+          f"(expected: {disputed.winner_name}, {disputed.ticks}, {disputed.hp_left})")
+    print(f"Tick log entries: {len(replayed.log)}")
+    assert (replayed.winner, replayed.ticks, replayed.hp_left) == \
+        (disputed.winner, disputed.ticks, disputed.hp_left)
+    assert len(replayed.log) == disputed.ticks
+    
+    # A short tick cap travels with the record, and finished ids are released
+    capped = Arena(seed=7, max_ticks=5)
+    capped.start(fighter, weakling, match_id=3)
+    first = capped.run()[0]
+    replayed = Arena.replay(first.to_dict())
+    print(f"Capped match: {first.ticks} ticks, replay {replayed.ticks} (expected: 5, 5)")
+    assert first.ticks == replayed.ticks == 5 and replayed.hp_left == first.hp_left
+    capped.start(fighter, weakling, match_id=3)
+    assert capped.start(fighter, weakling) == 4 and len(capped._live_ids) == 2
+    capped.run()
+    assert not capped._live_ids
+    
+    result = resolve_battle(veteran.game_state.player, rookie.game_state.player, seed=5)
+    print(f"resolve_battle: {result['winner_name']} in {result['ticks']} ticks")
+    assert result["success"] and result == resolve_battle(
+        veteran.game_state.player, rookie.game_state.player, seed=5)
+
+
 def run_all_tests():
     """Run all tests."""
     print("\n" + "="*70)
@@ -230,6 +813,19 @@ def run_all_tests():
         ("Daily Loop Logic", test_daily_loop),
         ("CLI Interface", test_cli_commands),
         ("Complex Scenario", test_complex_scenario),
+        ("Leaderboard", test_leaderboard),
+        ("Analytics", test_analytics),
+        ("Instrumentation", test_instrumentation),
+        ("Fast Startup", test_fast_startup),
+        ("Cacheable Responses", test_cacheable_responses),
+        ("Calendar Mode", test_calendar_mode),
+        ("Expiry Scheduler", test_expiry_scheduler),
+        ("Time-Series Store", test_time_series),
+        ("Preview & Undo", test_snapshots),
+        ("Adaptive Difficulty", test_adaptive_difficulty),
+        ("Load Generator", test_load_generator),
+        ("Balance Config & Sweep", test_balance_config),
+        ("Battle Engine", test_battle_engine),
     ]
     
     for name, test_func in tests:
@@ -0,0 +1,356 @@
+"""
+Life RPG Analytics
+Streaming aggregation of engine events into daily/weekly metrics.
+
+Architecture:
+- Histogram: Fixed-bucket histogram with percentile estimates
+- DayBucket: Counters and histograms for one game day
+- AnalyticsPipeline: Engine listener keeping a rolling window of DayBuckets
+  plus lifetime histograms, with a query API and periodic export
+"""
+
+import json
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from life_rpg_game_master import BuffType, GameEngine, GameEvent
+
+
+# Upper bounds of histogram buckets (a final overflow bucket is implicit)
+XP_BUCKETS = [0, 10, 20, 25, 40, 50, 75, 100, 150, 200, 300]
+LEVEL_VELOCITY_BUCKETS = [1, 2, 3, 4, 5, 7, 10, 14, 21, 30, 60]
+
+DEFAULT_WINDOW_DAYS = 28
+
+
+# ============================================================================
+# HISTOGRAM
+# ============================================================================
+
+class Histogram:
+    """Fixed-bucket histogram; memory is bounded by the bucket count."""
+
+    def __init__(self, bounds: List[float]):
+        """Create a histogram with the given ascending bucket upper bounds."""
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, weight: int = 1):
+        """Record a value."""
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += weight
+        self.count += weight
+        self.total += value * weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "Histogram"):
+        """Fold another histogram with the same bounds into this one."""
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different bounds")
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def mean(self) -> Optional[float]:
+        """Return the exact mean of recorded values."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Estimate the p-th percentile (0-100) by interpolating in-bucket."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lower = self.bounds[i - 1] if i > 0 else self.min
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * ((rank - seen) / c)
+            seen += c
+        return self.max
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output."""
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": dict(zip([str(b) for b in self.bounds] + ["inf"], self.counts))
+        }
+
+
+# ============================================================================
+# DAY BUCKET
+# ============================================================================
+
+@dataclass
+class DayBucket:
+    """Aggregated metrics for one game day across all players."""
+    day: int
+    completions: Counter = field(default_factory=Counter)
+    misses: Counter = field(default_factory=Counter)
+    auto_missed: int = 0
+    player_days: int = 0
+    level_ups: int = 0
+    fatigue_activations: int = 0
+    buffs_applied: Counter = field(default_factory=Counter)
+    xp_awarded: Histogram = field(default_factory=lambda: Histogram(XP_BUCKETS))
+
+    def merge(self, other: "DayBucket"):
+        """Fold another bucket into this one."""
+        self.completions.update(other.completions)
+        self.misses.update(other.misses)
+        self.auto_missed += other.auto_missed
+        self.player_days += other.player_days
+        self.level_ups += other.level_ups
+        self.fatigue_activations += other.fatigue_activations
+        self.buffs_applied.update(other.buffs_applied)
+        self.xp_awarded.merge(other.xp_awarded)
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output."""
+        fatigue_rate = (
+            self.fatigue_activations / self.player_days if self.player_days else None
+        )
+        return {
+            "day": self.day,
+            "completions": dict(self.completions),
+            "misses": dict(self.misses),
+            "auto_missed": self.auto_missed,
+            "player_days": self.player_days,
+            "level_ups": self.level_ups,
+            "fatigue_activations": self.fatigue_activations,
+            "fatigue_activation_rate": fatigue_rate,
+            "buffs_applied": dict(self.buffs_applied),
+            "xp_awarded": self.xp_awarded.to_dict()
+        }
+
+
+def _decrement(counter: Counter, key: str):
+    """Take one off a Counter entry, dropping it at zero."""
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+class AnalyticsPipeline:
+    """Rolling metrics fed by GameEngine events.
+
+    Only the last `window_days` day buckets are retained; lifetime XP and
+    level-up velocity are kept as fixed-size histograms, so memory does not
+    grow with the number of events processed.
+    """
+
+    def __init__(self, window_days: int = DEFAULT_WINDOW_DAYS,
+                 exporter: Optional[Callable[[Dict], None]] = None,
+                 export_every: int = 0):
+        """Create a pipeline.
+
+        If `exporter` is given it is called with `to_dict()` each time
+        `export_every` more game days have closed. A day closes when the
+        first attached player advances past it, so the cadence does not
+        depend on how many players are attached.
+        """
+        self.window_days = window_days
+        self.exporter = exporter
+        self.export_every = export_every
+        self._days: "OrderedDict[int, DayBucket]" = OrderedDict()
+        self._lifetime_xp = Histogram(XP_BUCKETS)
+        self._level_velocity = Histogram(LEVEL_VELOCITY_BUCKETS)
+        # player_id -> days of the player's level-ups (the last one drives
+        # velocity; earlier ones let an undone level-up be reversed)
+        self._level_days: Dict[str, List[int]] = {}
+        self._listeners: Dict[str, tuple] = {}
+        self._days_since_export = 0
+        self._newest_closed_day = 0
+        self.events_processed = 0
+
+    # ========================================================================
+    # FEEDING
+    # ========================================================================
+
+    def attach(self, engine: GameEngine, player_id: Optional[str] = None) -> str:
+        """Start consuming an engine's events for one player."""
+        player_id = player_id or engine.game_state.player.name
+        if player_id in self._listeners:
+            raise ValueError(f"Player '{player_id}' is already attached")
+
+        def listener(event: GameEvent, source: GameEngine, payload: Dict):
+            self.on_event(event, source, payload, player_id)
+
+        engine.subscribe(listener)
+        self._listeners[player_id] = (engine, listener)
+        return player_id
+
+    def detach(self, player_id: str):
+        """Stop consuming a player's events."""
+        engine, listener = self._listeners.pop(player_id)
+        engine.unsubscribe(listener)
+        self._level_days.pop(player_id, None)
+
+    def _bucket(self, day: int) -> DayBucket:
+        """Return the bucket for a day, evicting buckets outside the window."""
+        bucket = self._days.get(day)
+        if bucket is None:
+            bucket = self._days[day] = DayBucket(day=day)
+            # Players may be on different days; keep the newest ones. A
+            # bucket older than the window is returned detached and dropped.
+            while len(self._days) > self.window_days:
+                del self._days[min(self._days)]
+        return bucket
+
+    def on_event(self, event: GameEvent, engine: GameEngine, payload: Dict,
+                 player_id: Optional[str] = None):
+        """Engine listener: fold one event into the aggregates.
+
+        `player_id` defaults to the engine's player name.
+        """
+        player_id = player_id or engine.game_state.player.name
+        self.events_processed += 1
+        day = engine.game_state.player.current_day
+
+        if event == GameEvent.QUEST_COMPLETED:
+            bucket = self._bucket(day)
+            bucket.completions[payload["quest"].difficulty.value] += 1
+            bucket.xp_awarded.add(payload["xp_awarded"])
+            self._lifetime_xp.add(payload["xp_awarded"])
+        elif event == GameEvent.QUEST_MISSED:
+            self._bucket(day).misses[payload["quest"].difficulty.value] += 1
+        elif event == GameEvent.LEVEL_UP:
+            self._bucket(day).level_ups += 1
+            gained = payload["new_level"] - payload["old_level"]
+            level_days = self._level_days.setdefault(player_id, [])
+            last_day = level_days[-1] if level_days else 1
+            self._level_velocity.add((day - last_day) / gained, gained)
+            level_days.append(day)
+        elif event == GameEvent.BUFF_APPLIED:
+            buff_type = payload["buff"].buff_type
+            bucket = self._bucket(day)
+            bucket.buffs_applied[buff_type.value] += 1
+            if buff_type == BuffType.FATIGUE:
+                bucket.fatigue_activations += 1
+        elif event == GameEvent.DAY_ADVANCED:
+            # The payload day is the new day; the finished day closes out
+            bucket = self._bucket(payload["day"] - 1)
+            bucket.player_days += 1
+            bucket.auto_missed += payload["auto_missed"]
+            self._maybe_export(bucket.day)
+        elif event == GameEvent.STATE_RESTORED:
+            self._reverse(player_id, payload["undone_events"])
+
+    def _reverse(self, player_id: str, undone_events: List):
+        """Subtract undone events, newest first.
+
+        Days already evicted from the window are left alone, exports already
+        sent are not recalled, and histogram min/max stay as recorded.
+        """
+        for event, payload, day in reversed(undone_events):
+            if event == GameEvent.DAY_ADVANCED:
+                day = payload["day"] - 1
+            bucket = self._days.get(day)
+
+            if event == GameEvent.QUEST_COMPLETED:
+                self._lifetime_xp.add(payload["xp_awarded"], -1)
+                if bucket:
+                    _decrement(bucket.completions, payload["quest"].difficulty.value)
+                    bucket.xp_awarded.add(payload["xp_awarded"], -1)
+            elif event == GameEvent.QUEST_MISSED:
+                if bucket:
+                    _decrement(bucket.misses, payload["quest"].difficulty.value)
+            elif event == GameEvent.LEVEL_UP:
+                gained = payload["new_level"] - payload["old_level"]
+                level_days = self._level_days.get(player_id)
+                if level_days:
+                    level_days.pop()
+                    last_day = level_days[-1] if level_days else 1
+                    self._level_velocity.add((day - last_day) / gained, -gained)
+                if bucket:
+                    bucket.level_ups -= 1
+            elif event == GameEvent.BUFF_APPLIED:
+                if bucket:
+                    buff_type = payload["buff"].buff_type
+                    _decrement(bucket.buffs_applied, buff_type.value)
+                    if buff_type == BuffType.FATIGUE:
+                        bucket.fatigue_activations -= 1
+            elif event == GameEvent.DAY_ADVANCED:
+                if bucket:
+                    bucket.player_days -= 1
+                    bucket.auto_missed -= payload["auto_missed"]
+
+    def _maybe_export(self, closed_day: int):
+        """Call the exporter every `export_every` newly closed days."""
+        if closed_day <= self._newest_closed_day:
+            return
+        self._newest_closed_day = closed_day
+        if not self.exporter or self.export_every <= 0:
+            return
+        self._days_since_export += 1
+        if self._days_since_export >= self.export_every:
+            self._days_since_export = 0
+            self.exporter(self.to_dict())
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def daily(self, day: int) -> Optional[Dict]:
+        """Return metrics for one day, if it is still in the window."""
+        bucket = self._days.get(day)
+        return bucket.to_dict() if bucket else None
+
+    def weekly(self, week: int) -> Dict:
+        """Return metrics summed over a week (week 0 is days 1-7)."""
+        total = DayBucket(day=week * 7 + 1)
+        for day in range(week * 7 + 1, week * 7 + 8):
+            bucket = self._days.get(day)
+            if bucket:
+                total.merge(bucket)
+        result = total.to_dict()
+        del result["day"]
+        result["week"] = week
+        return result
+
+    def percentile(self, metric: str, p: float) -> Optional[float]:
+        """Estimate a percentile of a lifetime metric ('xp' or 'level_velocity')."""
+        histograms = {"xp": self._lifetime_xp, "level_velocity": self._level_velocity}
+        if metric not in histograms:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from {sorted(histograms)}")
+        return histograms[metric].percentile(p)
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output."""
+        return {
+            "events_processed": self.events_processed,
+            "days": [b.to_dict() for _, b in sorted(self._days.items())],
+            "xp_distribution": self._lifetime_xp.to_dict(),
+            "level_up_velocity_days": self._level_velocity.to_dict()
+        }
+
+    def export_json(self, path: str):
+        """Write the current aggregates to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
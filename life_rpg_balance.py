@@ -0,0 +1,326 @@
+"""
+Life RPG Balance Sweeps
+Evaluate GameConfig candidates by simulating archetypal players.
+
+Architecture:
+- Archetype: How a kind of player behaves (completion odds per difficulty,
+  which weekdays they play)
+- simulate(): One seeded GameEngine run for one config and archetype
+- grid() / random_configs(): Candidate configs from a search space
+- run_sweep(): Evaluates candidates on a process pool, reusing results
+  cached on disk under a hash of the config and simulation settings
+- summary_table(): Days per level-up and fatigue frequency per archetype
+
+Every simulation is seeded (engine quest generation and player behavior),
+so a cached result is exactly what a rerun would compute.
+
+Usage:
+    python3 life_rpg_balance.py                                  # default grid
+    python3 life_rpg_balance.py --grid xp_per_level=80,100,120 --grid fatigue_xp_penalty=0.7,0.9
+    python3 life_rpg_balance.py --random 40 --days 120 --workers 8
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from life_rpg_game_master import (
+    DEFAULT_CONFIG, BuffType, GameConfig, GameEngine, GameEvent
+)
+
+
+# ============================================================================
+# ARCHETYPES
+# ============================================================================
+
+@dataclass(frozen=True)
+class Archetype:
+    """A simulated player's behavior."""
+    name: str
+    # Chance of completing a quest of each difficulty on a day they play
+    completion: Dict[str, float]
+    # Weekdays (day % 7) they play; None means every day
+    active_weekdays: Optional[Tuple[int, ...]] = None
+
+    def plays_on(self, day: int) -> bool:
+        """True if the player opens the app on this game day."""
+        return self.active_weekdays is None or day % 7 in self.active_weekdays
+
+
+ARCHETYPES = {
+    "diligent": Archetype("diligent", {"easy": 0.95, "medium": 0.9, "hard": 0.8, "boss": 0.3}),
+    "casual": Archetype("casual", {"easy": 0.75, "medium": 0.55, "hard": 0.3, "boss": 0.05}),
+    "struggling": Archetype("struggling", {"easy": 0.45, "medium": 0.25, "hard": 0.1, "boss": 0.0}),
+    "weekend": Archetype("weekend", {"easy": 0.9, "medium": 0.85, "hard": 0.7, "boss": 0.5},
+                         active_weekdays=(5, 6)),
+}
+
+# Swept when no search space is given
+DEFAULT_SPACE = {
+    "xp_per_level": [80, 100, 130],
+    "fatigue_xp_penalty": [0.7, 0.8, 0.9],
+    "fatigue_debuff_duration": [2, 3],
+}
+
+CONFIG_FIELDS = {f.name for f in fields(GameConfig)}
+DEFAULT_CACHE = ".balance_cache.json"
+# Part of every cache key; bump when simulate() or engine rules change so
+# results computed by older code are not reused
+SIMULATION_VERSION = 1
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def simulate(config: GameConfig, archetype: Archetype, days: int = 90, seed: int = 0) -> Dict:
+    """Play `days` days as `archetype` and measure progression and fatigue."""
+    engine = GameEngine(archetype.name, seed=seed, config=config)
+    behavior = random.Random(f"{seed}:{archetype.name}")
+    level_up_days: List[int] = []
+    fatigue_applied = 0
+
+    def on_event(event, engine, payload):
+        nonlocal fatigue_applied
+        if event == GameEvent.LEVEL_UP:
+            level_up_days.extend([engine.game_state.player.current_day]
+                                 * (payload["new_level"] - payload["old_level"]))
+        elif event == GameEvent.BUFF_APPLIED and payload["buff"].buff_type == BuffType.FATIGUE:
+            fatigue_applied += 1
+
+    engine.subscribe(on_event)
+    fatigued_days = 0
+    for _ in range(days):
+        player = engine.game_state.player
+        if archetype.plays_on(player.current_day):
+            open_quests = [q for q in engine.game_state.active_quests
+                           if not q.completed and not q.missed]
+            for quest in open_quests:
+                if behavior.random() < archetype.completion.get(quest.difficulty.value, 0.0):
+                    engine.complete_quest(quest.quest_id)
+        if any(b.buff_type == BuffType.FATIGUE for b in player.active_buffs):
+            fatigued_days += 1
+        engine.next_day()
+
+    player = engine.game_state.player
+    return {
+        "final_level": player.level,
+        "total_xp": player.total_xp_earned,
+        "days_per_level": round(days / len(level_up_days), 2) if level_up_days else None,
+        "first_level_up_day": level_up_days[0] if level_up_days else None,
+        "fatigue_applied": fatigue_applied,
+        "fatigued_day_share": round(fatigued_days / days, 4),
+    }
+
+
+def _mean(values: List[Optional[float]]) -> Optional[float]:
+    """Mean of the non-None values, or None if there are none."""
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 3) if values else None
+
+
+def evaluate(config_data: Dict, archetypes: Tuple[str, ...], days: int,
+             seeds: int) -> Dict[str, Dict]:
+    """Average simulate() over seeds for each archetype (process pool task)."""
+    config = GameConfig.from_dict(config_data)
+    results = {}
+    for name in archetypes:
+        runs = [simulate(config, ARCHETYPES[name], days, seed) for seed in range(seeds)]
+        results[name] = {key: _mean([run[key] for run in runs]) for key in runs[0]}
+    return results
+
+
+# ============================================================================
+# SEARCH SPACES
+# ============================================================================
+
+def _check_space(space: Dict[str, list]):
+    """Reject keys that are not GameConfig fields."""
+    unknown = set(space) - CONFIG_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown config fields {sorted(unknown)}. Choose from {sorted(CONFIG_FIELDS)}")
+
+
+def grid(space: Dict[str, list], base: GameConfig = DEFAULT_CONFIG) -> List[GameConfig]:
+    """Every combination of the values in `space`, applied over `base`."""
+    _check_space(space)
+    keys = list(space)
+    configs = []
+    for values in itertools.product(*(space[k] for k in keys)):
+        data = base.to_dict()
+        data.update(zip(keys, values))
+        configs.append(GameConfig.from_dict(data))
+    return configs
+
+
+def random_configs(space: Dict[str, list], count: int, seed: int = 0,
+                   base: GameConfig = DEFAULT_CONFIG) -> List[GameConfig]:
+    """`count` distinct configs drawn uniformly from `space`."""
+    _check_space(space)
+    rng = random.Random(seed)
+    combinations = 1
+    for values in space.values():
+        combinations *= len({json.dumps(v, sort_keys=True) for v in values})
+    seen, configs = set(), []
+    while len(configs) < min(count, combinations):
+        data = base.to_dict()
+        data.update({k: rng.choice(v) for k, v in space.items()})
+        config = GameConfig.from_dict(data)
+        if config.config_hash() not in seen:
+            seen.add(config.config_hash())
+            configs.append(config)
+    return configs
+
+
+# ============================================================================
+# SWEEP
+# ============================================================================
+
+def point_key(config: GameConfig, archetypes: Iterable[str], days: int, seeds: int) -> str:
+    """Cache key: the config plus everything else that shapes its result."""
+    settings = json.dumps({"version": SIMULATION_VERSION, "config": config.config_hash(),
+                           "archetypes": [asdict(ARCHETYPES[name]) for name in sorted(archetypes)],
+                           "days": days, "seeds": seeds}, sort_keys=True)
+    return hashlib.sha256(settings.encode()).hexdigest()[:16]
+
+
+def run_sweep(configs: List[GameConfig], archetypes: Iterable[str] = tuple(ARCHETYPES),
+              days: int = 90, seeds: int = 3, workers: Optional[int] = None,
+              cache_path: Optional[str] = DEFAULT_CACHE) -> List[Dict]:
+    """Evaluate configs, computing only points missing from the cache.
+
+    Returns one row per config: {"key", "config", "results", "cached"}.
+    `workers=1` runs in-process; otherwise a ProcessPoolExecutor is used.
+    """
+    archetypes = tuple(archetypes)
+    unknown = set(archetypes) - set(ARCHETYPES)
+    if unknown:
+        raise ValueError(f"Unknown archetypes {sorted(unknown)}. Choose from {sorted(ARCHETYPES)}")
+
+    cache: Dict[str, Dict] = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    rows = []
+    todo = []
+    for config in configs:
+        key = point_key(config, archetypes, days, seeds)
+        row = {"key": key, "config": config.to_dict(), "results": None, "cached": key in cache}
+        if row["cached"]:
+            row["results"] = cache[key]["results"]
+        else:
+            todo.append(row)
+        rows.append(row)
+
+    if todo:
+        args = [(row["config"], archetypes, days, seeds) for row in todo]
+        if workers == 1:
+            computed = [evaluate(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                computed = list(pool.map(evaluate, *zip(*args)))
+        for row, results in zip(todo, computed):
+            row["results"] = results
+            cache[row["key"]] = {"config": row["config"], "results": results}
+        if cache_path:
+            with open(cache_path, "w") as f:
+                json.dump(cache, f, indent=2, sort_keys=True)
+
+    return rows
+
+
+def _changes(config_data: Dict) -> str:
+    """Describe how a config differs from the defaults."""
+    default = DEFAULT_CONFIG.to_dict()
+    changed = [f"{k}={v}" for k, v in config_data.items() if v != default[k]]
+    return ", ".join(changed) or "(defaults)"
+
+
+def summary_table(rows: List[Dict], archetypes: Optional[Iterable[str]] = None) -> str:
+    """Days per level-up / fatigued-day share per archetype, one line per config."""
+    if not rows:
+        return "No configs evaluated."
+    archetypes = list(archetypes or rows[0]["results"])
+    labels = [_changes(row["config"]) for row in rows]
+    width = max(len("config"), *(len(label) for label in labels)) + 2
+    header = f"{'config':<{width}}" + "".join(f"{name:>20}" for name in archetypes)
+    lines = [header, " " * width + f"{'days/lvl  fatigue':>20}" * len(archetypes),
+             "-" * len(header)]
+    for label, row in zip(labels, rows):
+        cells = []
+        for name in archetypes:
+            result = row["results"][name]
+            days = result["days_per_level"]
+            days_text = f"{days:.1f}" if days is not None else "never"
+            cells.append(f"{days_text:>9} {result['fatigued_day_share'] * 100:8.1f}%")
+        lines.append(f"{label:<{width}}" + "".join(f"{c:>20}" for c in cells))
+    return "\n".join(lines)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _parse_value(text: str):
+    """Parse a --grid value as int, float, or JSON."""
+    for parse in (int, float, json.loads):
+        try:
+            return parse(text)
+        except ValueError:
+            continue
+    raise ValueError(f"Cannot parse value '{text}'")
+
+
+def main(argv=None):
+    """Entry point: run a sweep and print the summary table."""
+    parser = argparse.ArgumentParser(description="Life RPG balance sweep")
+    parser.add_argument("--grid", action="append", default=[], metavar="FIELD=V1,V2",
+                        help="Values to sweep for a GameConfig field (repeatable)")
+    parser.add_argument("--random", type=int, default=0, metavar="N",
+                        help="Sample N configs from the space instead of the full grid")
+    parser.add_argument("--archetypes", default=",".join(ARCHETYPES),
+                        help="Comma-separated archetypes to simulate")
+    parser.add_argument("--days", type=int, default=90, help="Days simulated per run")
+    parser.add_argument("--seeds", type=int, default=3, help="Seeds averaged per archetype")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --random sampling")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="Result cache path ('' disables)")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    args = parser.parse_args(argv)
+
+    archetypes = args.archetypes.split(",")
+    try:
+        space = {}
+        for spec in args.grid:
+            name, sep, values = spec.partition("=")
+            if not sep or not name or not values:
+                raise ValueError(f"Invalid --grid '{spec}'. Expected FIELD=V1,V2")
+            space[name] = [_parse_value(v) for v in values.split(",")]
+        space = space or DEFAULT_SPACE
+        configs = (random_configs(space, args.random, args.seed) if args.random
+                   else grid(space))
+        rows = run_sweep(configs, archetypes, args.days, args.seeds,
+                         args.workers, args.cache or None)
+    except ValueError as e:
+        print(json.dumps({"success": False, "error": str(e)}, indent=2))
+        return 1
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        cached = sum(row["cached"] for row in rows)
+        print(summary_table(rows, archetypes))
+        print(f"\n{len(rows)} configs, {cached} from cache, {len(rows) - cached} computed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+Life RPG Battle Engine
+Resolve arena encounters between players from their stats and buffs.
+
+Architecture:
+- Combatant: Integer combat profile derived from a Player's Stats, level
+  and active buffs
+- Arena: Every live match stored column-wise (one array per attribute and
+  side), advanced together one tick at a time
+- MatchResult: Outcome plus everything needed to replay the match
+
+Determinism: all combat math is integer, and each match draws its rolls
+from a counter-based generator, splitmix64(key(seed, match_id) + tick),
+instead of a shared stateful RNG. A match's outcome therefore depends
+only on the arena seed, its match id and the two combatants -- not on
+which other matches were running alongside it -- so Arena.replay() can
+re-run a single disputed match and reproduce it exactly.
+
+Each tick both sides strike simultaneously. A strike deals attack minus
+the target's defense (at least 1), halved once the striker's stamina is
+spent, multiplied by 1.5 on a crit and cancelled by a dodge. A match ends
+when either side drops to 0 HP or after MAX_TICKS, when the higher share
+of remaining HP wins.
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+from life_rpg_game_master import BuffType, Player
+
+
+MAX_TICKS = 100
+HP_PER_HEALTH = 5
+STAMINA_PER_STRIKE = 5
+ROLL_SCALE = 1024  # crit and dodge chances are out of this
+
+# BuffType -> (attack %, defense %, crit chance bonus out of ROLL_SCALE)
+BUFF_COMBAT_EFFECTS = {
+    BuffType.FOCUS_MODE: (100, 100, 128),
+    BuffType.DOUBLE_XP: (125, 100, 0),
+    BuffType.STREAK_BONUS: (100, 125, 0),
+    BuffType.FATIGUE: (80, 90, 0),
+}
+
+MASK64 = (1 << 64) - 1
+
+
+def splitmix64(x: int) -> int:
+    """SplitMix64 output for counter value `x` (a 64-bit integer)."""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def match_key(seed: int, match_id: int) -> int:
+    """Per-match stream key; tick t of the match uses splitmix64(key + t)."""
+    return splitmix64((seed & MASK64) ^ splitmix64(match_id & MASK64))
+
+
+# ============================================================================
+# COMBATANTS AND RESULTS
+# ============================================================================
+
+@dataclass(frozen=True)
+class Combatant:
+    """A fighter's combat profile (all integers)."""
+    name: str
+    hp: int
+    attack: int
+    defense: int
+    crit: int  # chance out of ROLL_SCALE
+    dodge: int  # chance out of ROLL_SCALE
+    stamina: int
+
+    @classmethod
+    def from_player(cls, player: Player) -> "Combatant":
+        """Derive a profile from a player's stats, level and active buffs."""
+        stats = player.stats
+        attack = 20 + max(0, stats.productivity) // 2 + player.level * 2
+        defense = max(0, stats.discipline) // 5
+        crit = max(0, stats.focus) * 4
+        for buff in player.active_buffs:
+            attack_pct, defense_pct, crit_bonus = BUFF_COMBAT_EFFECTS.get(buff.buff_type, (100, 100, 0))
+            attack = attack * attack_pct // 100
+            defense = defense * defense_pct // 100
+            crit += crit_bonus
+        return cls(
+            name=player.name,
+            hp=max(1, stats.health) * HP_PER_HEALTH,
+            attack=max(1, attack),
+            defense=defense,
+            crit=min(ROLL_SCALE // 2, crit),
+            dodge=min(ROLL_SCALE // 4, max(0, stats.consistency) * 2),
+            stamina=max(0, stats.energy),
+        )
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output."""
+        return {
+            "name": self.name,
+            "hp": self.hp,
+            "attack": self.attack,
+            "defense": self.defense,
+            "crit": self.crit,
+            "dodge": self.dodge,
+            "stamina": self.stamina
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Combatant":
+        """Rebuild a combatant saved with to_dict()."""
+        return cls(**data)
+
+
+@dataclass(frozen=True)
+class MatchResult:
+    """Outcome of one match; `winner` is "a", "b" or None for a draw.
+
+    With a logging Arena, `log` holds one (tick, damage to b, damage to a,
+    hp a, hp b) tuple per tick.
+    """
+    match_id: int
+    seed: int
+    a: Combatant
+    b: Combatant
+    winner: Optional[str]
+    ticks: int
+    hp_left: Tuple[int, int]
+    max_ticks: int = MAX_TICKS
+    log: Optional[List[Tuple[int, int, int, int, int]]] = None
+
+    @property
+    def winner_name(self) -> Optional[str]:
+        """Name of the winning combatant, or None for a draw."""
+        if self.winner is None:
+            return None
+        return self.a.name if self.winner == "a" else self.b.name
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output (the replay record)."""
+        data = {
+            "match_id": self.match_id,
+            "seed": self.seed,
+            "a": self.a.to_dict(),
+            "b": self.b.to_dict(),
+            "winner": self.winner,
+            "winner_name": self.winner_name,
+            "ticks": self.ticks,
+            "hp_left": list(self.hp_left),
+            "max_ticks": self.max_ticks
+        }
+        if self.log is not None:
+            data["log"] = [list(entry) for entry in self.log]
+        return data
+
+
+# ============================================================================
+# ARENA
+# ============================================================================
+
+class Arena:
+    """All live matches, advanced together in batched ticks.
+
+    Match state lives in parallel arrays (one slot per live match) rather
+    than per-match objects; finished matches are swap-removed so the
+    arrays stay dense. Combatant objects are only consulted when a match
+    finishes.
+    """
+
+    _COLUMNS = ("hp_a", "hp_b", "atk_a", "atk_b", "def_a", "def_b", "crit_a", "crit_b",
+                "dodge_a", "dodge_b", "sta_a", "sta_b", "ticks", "ids")
+
+    def __init__(self, seed: int = 0, max_ticks: int = MAX_TICKS, keep_log: bool = False):
+        """Create an empty arena; `keep_log` records every tick for replays."""
+        self.seed = seed
+        self.max_ticks = max_ticks
+        self.keep_log = keep_log
+        for name in self._COLUMNS:
+            setattr(self, name, array("q"))
+        self.keys = array("Q")
+        self._pairs: List[Tuple[Combatant, Combatant]] = []
+        self._logs: Dict[int, list] = {}
+        self._live_ids = set()
+        self._next_id = 0  # above every id started so far
+        self.matches_finished = 0
+
+    def __len__(self) -> int:
+        """Number of live matches."""
+        return len(self.ids)
+
+    def start(self, a: Combatant, b: Combatant, match_id: Optional[int] = None) -> int:
+        """Queue a match between `a` and `b`; returns its match id."""
+        if match_id is None:
+            match_id = self._next_id
+        elif match_id in self._live_ids:
+            raise ValueError(f"Match id {match_id} is already live in this arena")
+        self._live_ids.add(match_id)
+        self._next_id = max(self._next_id, match_id + 1)
+
+        for name, value in (("hp_a", a.hp), ("hp_b", b.hp),
+                            ("atk_a", a.attack), ("atk_b", b.attack),
+                            ("def_a", a.defense), ("def_b", b.defense),
+                            ("crit_a", a.crit), ("crit_b", b.crit),
+                            ("dodge_a", a.dodge), ("dodge_b", b.dodge),
+                            ("sta_a", a.stamina), ("sta_b", b.stamina),
+                            ("ticks", 0), ("ids", match_id)):
+            getattr(self, name).append(value)
+        self.keys.append(match_key(self.seed, match_id))
+        self._pairs.append((a, b))
+        if self.keep_log:
+            self._logs[match_id] = []
+        return match_id
+
+    def _remove(self, slot: int):
+        """Swap-remove a slot from every column."""
+        last = len(self.ids) - 1
+        for name in self._COLUMNS + ("keys",):
+            column = getattr(self, name)
+            column[slot] = column[last]
+            column.pop()
+        self._pairs[slot] = self._pairs[last]
+        self._pairs.pop()
+
+    def _finish(self, slot: int) -> MatchResult:
+        """Build the result for a finished slot."""
+        a, b = self._pairs[slot]
+        hp_a, hp_b = self.hp_a[slot], self.hp_b[slot]
+        left_a, left_b = max(0, hp_a), max(0, hp_b)
+        # Compare remaining HP shares without floats: left_a/a.hp vs left_b/b.hp
+        share_a, share_b = left_a * b.hp, left_b * a.hp
+        if share_a == share_b:
+            winner = None
+        else:
+            winner = "a" if share_a > share_b else "b"
+        match_id = self.ids[slot]
+        self._live_ids.discard(match_id)
+        return MatchResult(
+            match_id=match_id,
+            seed=self.seed,
+            a=a,
+            b=b,
+            winner=winner,
+            ticks=self.ticks[slot],
+            hp_left=(left_a, left_b),
+            max_ticks=self.max_ticks,
+            log=self._logs.pop(match_id) if self.keep_log else None,
+        )
+
+    def tick(self) -> List[MatchResult]:
+        """Advance every live match one tick; return those that finished."""
+        hp_a, hp_b = self.hp_a, self.hp_b
+        atk_a, atk_b, def_a, def_b = self.atk_a, self.atk_b, self.def_a, self.def_b
+        crit_a, crit_b, dodge_a, dodge_b = self.crit_a, self.crit_b, self.dodge_a, self.dodge_b
+        sta_a, sta_b, ticks, keys = self.sta_a, self.sta_b, self.ticks, self.keys
+        logs = self._logs if self.keep_log else None
+        max_ticks = self.max_ticks
+        done = []
+
+        for i in range(len(keys)):
+            t = ticks[i] + 1
+            ticks[i] = t
+            # One 64-bit draw per match per tick, split into four 10-bit rolls
+            r = splitmix64((keys[i] + t) & MASK64)
+
+            dmg_b = 0  # damage dealt to b by a
+            if (r & 1023) >= dodge_b[i]:
+                dmg_b = max(1, atk_a[i] - def_b[i])
+                if sta_a[i] > 0:
+                    sta_a[i] -= STAMINA_PER_STRIKE
+                else:
+                    dmg_b = max(1, dmg_b // 2)
+                if ((r >> 10) & 1023) < crit_a[i]:
+                    dmg_b = dmg_b * 3 // 2
+
+            dmg_a = 0  # damage dealt to a by b
+            if ((r >> 20) & 1023) >= dodge_a[i]:
+                dmg_a = max(1, atk_b[i] - def_a[i])
+                if sta_b[i] > 0:
+                    sta_b[i] -= STAMINA_PER_STRIKE
+                else:
+                    dmg_a = max(1, dmg_a // 2)
+                if ((r >> 30) & 1023) < crit_b[i]:
+                    dmg_a = dmg_a * 3 // 2
+
+            hp_b[i] -= dmg_b
+            hp_a[i] -= dmg_a
+            if logs is not None:
+                logs[self.ids[i]].append((t, dmg_b, dmg_a, hp_a[i], hp_b[i]))
+            if hp_a[i] <= 0 or hp_b[i] <= 0 or t >= max_ticks:
+                done.append(i)
+
+        # Remove from the highest slot down so pending slot numbers stay valid
+        results = []
+        for slot in reversed(done):
+            results.append(self._finish(slot))
+            self._remove(slot)
+        self.matches_finished += len(results)
+        results.sort(key=lambda result: result.match_id)
+        return results
+
+    def run(self) -> List[MatchResult]:
+        """Tick until every live match has finished; results by match id."""
+        results = []
+        while len(self.ids):
+            results.extend(self.tick())
+        results.sort(key=lambda result: result.match_id)
+        return results
+
+    @staticmethod
+    def replay(record: Union[MatchResult, Dict], keep_log: bool = True) -> MatchResult:
+        """Re-run one match from its result or to_dict() record."""
+        if isinstance(record, MatchResult):
+            seed, match_id, a, b = record.seed, record.match_id, record.a, record.b
+            max_ticks = record.max_ticks
+        else:
+            seed, match_id = record["seed"], record["match_id"]
+            max_ticks = record.get("max_ticks", MAX_TICKS)
+            a, b = Combatant.from_dict(record["a"]), Combatant.from_dict(record["b"])
+        arena = Arena(seed=seed, max_ticks=max_ticks, keep_log=keep_log)
+        arena.start(a, b, match_id=match_id)
+        return arena.run()[0]
+
+
+def resolve_battle(a: Player, b: Player, seed: int = 0, match_id: int = 0) -> Dict:
+    """Fight two players once and return the replayable result record."""
+    arena = Arena(seed=seed, keep_log=True)
+    arena.start(Combatant.from_player(a), Combatant.from_player(b), match_id=match_id)
+    return {"success": True, **arena.run()[0].to_dict()}
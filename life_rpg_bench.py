@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Life RPG Benchmarks
+Micro-benchmarks for the game master. Results are printed as a table.
+
+Usage:
+    python3 life_rpg_bench.py            # run all benchmarks
+    python3 life_rpg_bench.py startup    # run one benchmark
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def print_section(title):
+    """Print a formatted section header."""
+    print(f"\n{'='*70}")
+    print(f"  {title}")
+    print(f"{'='*70}\n")
+
+
+def print_timings(label, samples_s):
+    """Print median and p90 of timing samples in milliseconds."""
+    samples_ms = sorted(s * 1000 for s in samples_s)
+    p90 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.9))]
+    print(f"  {label:<40} median {statistics.median(samples_ms):8.3f} ms   p90 {p90:8.3f} ms")
+
+
+def _time_subprocess(code, runs):
+    """Time fresh interpreter runs of a code snippet."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_startup(runs=20):
+    """Cold process-per-request latency vs. a prefork worker."""
+    print_section("BENCH: Startup")
+
+    print_timings("python -c pass (interpreter floor)", _time_subprocess("pass", runs))
+    print_timings("stdlib imports the module needs", _time_subprocess(
+        "import dataclasses, enum, random, typing", runs))
+    print_timings("import life_rpg_game_master",
+                  _time_subprocess("import life_rpg_game_master", runs))
+    print_timings("cold 'status' request", _time_subprocess(
+        "from life_rpg_game_master import CLIInterface;"
+        "print(CLIInterface().handle_command('status'))", runs))
+
+    from life_rpg_game_master import GameEngine
+    samples = []
+    for _ in range(runs * 10):
+        started = time.perf_counter()
+        GameEngine("Bench")
+        samples.append(time.perf_counter() - started)
+    print_timings("GameEngine() construction (in-process)", samples)
+
+    if hasattr(os, "fork"):
+        from life_rpg_worker import PreforkWorker
+        worker = PreforkWorker("Bench")
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            worker.handle("status")
+            samples.append(time.perf_counter() - started)
+        print_timings("prefork worker 'status' request", samples)
+
+
+def _time_calls(fn, runs):
+    """Time repeated in-process calls."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_snapshot(runs=200):
+    """Copy-on-write snapshot/preview vs. copy.deepcopy of the GameState."""
+    import copy
+    from life_rpg_game_master import GameEngine
+
+    for days in (7, 365, 1825):
+        print_section(f"BENCH: Snapshot ({days} days of history)")
+        engine = GameEngine("Bench", seed=1)
+        for _ in range(days):
+            open_quests = [q for q in engine.game_state.active_quests
+                           if not q.completed and not q.missed]
+            engine.complete_quest(open_quests[0].quest_id)
+            engine.next_day()
+        quest_id = [q for q in engine.game_state.active_quests
+                    if not q.completed and not q.missed][0].quest_id
+        print(f"  quests in state: {len(engine.game_state.active_quests)}")
+
+        print_timings("snapshot()", _time_calls(engine.snapshot, runs))
+        print_timings("copy.deepcopy(game_state)",
+                      _time_calls(lambda: copy.deepcopy(engine.game_state), runs // 10 or 1))
+        print_timings("preview('quest_complete')",
+                      _time_calls(lambda: engine.preview("quest_complete", quest_id), runs))
+
+        def deepcopy_preview():
+            saved = copy.deepcopy(engine.game_state)
+            engine._complete_quest(quest_id)
+            engine.game_state = saved
+
+        print_timings("deepcopy + complete + swap back",
+                      _time_calls(deepcopy_preview, runs // 10 or 1))
+
+
+def bench_loadgen(events=20000):
+    """Replay a synthesized trace unthrottled and at a fixed rate."""
+    from life_rpg_loadgen import CLIPool, replay, synthesize
+
+    print_section("BENCH: Load generator replay")
+    trace = synthesize(events=events, players=500, seed=1)
+    for rate in (0, 1000):
+        report = replay(trace, CLIPool(), rate=rate)
+        label = "unthrottled" if rate == 0 else f"{rate}/s"
+        print(f"  {label:<12} {report.throughput:9.1f} cmd/s   "
+              f"service p50 {report.service_us['p50']:8.1f} us   "
+              f"p99 {report.service_us['p99']:8.1f} us   "
+              f"p99.9 {report.service_us['p99.9']:8.1f} us")
+
+
+def bench_battle(matches=10000):
+    """Batched arena ticks for many concurrent matches, plus single replays."""
+    import random
+    from life_rpg_battle import Arena, Combatant
+
+    print_section("BENCH: Battle resolution")
+    rng = random.Random(1)
+    fighters = [Combatant(f"p{i}", rng.randint(300, 700), rng.randint(30, 70),
+                          rng.randint(0, 20), rng.randint(0, 400), rng.randint(0, 200),
+                          rng.randint(0, 150)) for i in range(matches + 1)]
+    for concurrent in (100, matches):
+        arena = Arena(seed=7)
+        for i in range(concurrent):
+            arena.start(fighters[i], fighters[i + 1])
+        started = time.perf_counter()
+        results = arena.run()
+        elapsed = time.perf_counter() - started
+        ticks = sum(r.ticks for r in results) / len(results)
+        print(f"  {concurrent:>6} concurrent matches   {len(results) / elapsed:10.0f} matches/s   "
+              f"mean {ticks:.1f} ticks")
+    print_timings("Arena.replay() of one logged match",
+                  _time_calls(lambda: Arena.replay(results[0]), 200))
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "snapshot": bench_snapshot,
+    "loadgen": bench_loadgen,
+    "battle": bench_battle,
+}
+
+
+def main(argv=None):
+    """Run the named benchmarks, or all of them."""
+    names = (argv if argv is not None else sys.argv[1:]) or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Choose from {sorted(BENCHMARKS)}")
+            return 1
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
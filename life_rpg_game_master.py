@@ -6,14 +6,36 @@ Architecture:
 - Data Models: Define game entities (Player, Quest, Stats, Buffs)
 - Game Engine: Core logic for XP, levels, quests, and daily mechanics
 - CLI Interface: Command handler and JSON output formatter
+
+Startup: `json` and `datetime` are imported on first use and CLIInterface
+builds its engine on first access, but these save little: a cold process
+is dominated by interpreter startup and the stdlib imports the data
+models need (`dataclasses`, `typing`, `enum`, `random`). Callers that need
+low per-request latency should use the prefork worker (life_rpg_worker),
+which pays that cost once; see `life_rpg_bench.py startup`.
+
+Caching: every mutation bumps GameState.version. Responses carry an ETag
+derived from it instead of a wall-clock timestamp, so identical states
+produce identical responses and pollers can ask for "not modified".
+
+Snapshots: quests live in a PersistentList and are replaced rather than
+edited, and buff lists are rebound rather than mutated, so a snapshot is
+O(1) and backs both preview() and undo().
+
+Adaptive difficulty: each Player carries a DifficultyModel of decayed
+completion rates, updated as quests are completed or missed, from which
+daily quest difficulty and templates are sampled.
 """
 
-import json
 import random
-from dataclasses import dataclass, asdict, field
-from typing import List, Dict, Optional
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Callable, List, Dict, Optional, Tuple
 from enum import Enum
-from datetime import datetime, timedelta
+from types import MappingProxyType
+
+from life_rpg_persistent import PersistentList
 
 
 # ============================================================================
@@ -43,6 +65,19 @@ class BuffType(Enum):
     STREAK_BONUS = "streak_bonus"
 
 
+class GameEvent(Enum):
+    """Events emitted by the engine to subscribed listeners."""
+    QUEST_COMPLETED = "quest_completed"
+    QUEST_MISSED = "quest_missed"
+    LEVEL_UP = "level_up"
+    DAY_ADVANCED = "day_advanced"
+    BUFF_APPLIED = "buff_applied"
+    BUFF_EXPIRED = "buff_expired"
+    PRE_COMMAND = "pre_command"
+    POST_COMMAND = "post_command"
+    STATE_RESTORED = "state_restored"
+
+
 # XP and difficulty constants
 XP_REWARDS = {
     Difficulty.EASY: 10,
@@ -56,6 +91,111 @@ XP_PER_LEVEL = 100
 STREAK_BONUS_MULTIPLIER = 1.5
 FATIGUE_DEBUFF_DURATION = 3  # days
 FATIGUE_XP_PENALTY = 0.8  # 20% XP reduction
+UNDO_HISTORY_DEPTH = 20  # Undoable commands remembered per engine
+
+
+@dataclass(frozen=True)
+class GameConfig:
+    """Balance parameters for one GameEngine; defaults are the constants above.
+
+    Immutable and hashable. `xp_rewards` may be passed as a mapping (missing
+    difficulties keep their defaults) and is stored as (Difficulty, xp)
+    pairs; look rewards up with xp_reward().
+    """
+    xp_rewards: Tuple[Tuple[Difficulty, int], ...] = tuple(XP_REWARDS.items())
+    missed_quest_penalty: int = MISSED_QUEST_PENALTY
+    xp_per_level: int = XP_PER_LEVEL
+    streak_bonus_multiplier: float = STREAK_BONUS_MULTIPLIER
+    fatigue_debuff_duration: int = FATIGUE_DEBUFF_DURATION
+    fatigue_xp_penalty: float = FATIGUE_XP_PENALTY
+
+    def __post_init__(self):
+        rewards = dict(XP_REWARDS)
+        rewards.update(dict(self.xp_rewards))
+        object.__setattr__(self, "xp_rewards", tuple(rewards.items()))
+        # Read-only lookup table; not a field, so it is not compared or hashed
+        object.__setattr__(self, "_xp_lookup", MappingProxyType(rewards))
+
+    def xp_reward(self, difficulty: Difficulty) -> int:
+        """Base XP for completing a quest of the given difficulty."""
+        return self._xp_lookup[difficulty]
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output."""
+        return {
+            "xp_rewards": {d.value: xp for d, xp in self.xp_rewards},
+            "missed_quest_penalty": self.missed_quest_penalty,
+            "xp_per_level": self.xp_per_level,
+            "streak_bonus_multiplier": self.streak_bonus_multiplier,
+            "fatigue_debuff_duration": self.fatigue_debuff_duration,
+            "fatigue_xp_penalty": self.fatigue_xp_penalty
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GameConfig":
+        """Build a config from to_dict() output; missing keys keep their defaults."""
+        data = dict(data)
+        if "xp_rewards" in data:
+            data["xp_rewards"] = {Difficulty(d): xp for d, xp in data["xp_rewards"].items()}
+        return cls(**data)
+
+    def config_hash(self) -> str:
+        """Stable digest of the parameters, for caching results per config."""
+        import hashlib
+        import json
+
+        canonical = json.dumps(self.to_dict(), sort_keys=True)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+DEFAULT_CONFIG = GameConfig()
+
+# Adaptive difficulty: completion rates are exponentially weighted averages
+ADAPTIVE_TARGET_COMPLETION = 0.7  # Rate at which the quest mix stays neutral
+ADAPTIVE_LEARNING_RATE = 0.2  # Weight of the newest outcome
+
+# Quest catalogs (built once at import instead of on every quest)
+DAILY_QUEST_DIFFICULTIES = (Difficulty.EASY, Difficulty.MEDIUM, Difficulty.HARD)
+
+DAILY_QUEST_TITLES = {
+    Difficulty.EASY: (
+        "Drink 8 glasses of water",
+        "Do 10-minute meditation",
+        "Take a 20-minute walk",
+        "Write 3 journal entries",
+        "Read 10 pages"
+    ),
+    Difficulty.MEDIUM: (
+        "Complete 1 hour focused work",
+        "Workout for 30 minutes",
+        "Learn something new for 45 minutes",
+        "Organize your workspace",
+        "Prepare healthy meals for tomorrow"
+    ),
+    Difficulty.HARD: (
+        "Complete a major project milestone",
+        "Write 1000+ words of content",
+        "Master a new skill (2+ hours)",
+        "Deep clean your environment",
+        "Have 3 meaningful conversations"
+    )
+}
+
+RANDOM_CHALLENGES = (
+    ("Unexpected Opportunity", "Seize an unexpected opportunity"),
+    ("Challenge Accepted", "Face a personal challenge head-on"),
+    ("Help Someone", "Do an act of kindness"),
+    ("Quick Win", "Complete something you've been procrastinating on"),
+    ("Stretch Goal", "Do something outside your comfort zone"),
+)
+
+WEEKLY_BOSS_QUESTS = (
+    ("Weekly Boss: Major Goal", "Complete your main weekly objective"),
+    ("Boss Challenge: Leadership", "Lead a team or group towards a goal"),
+    ("Boss Challenge: Innovation", "Create something new and meaningful"),
+    ("Boss Challenge: Mastery", "Achieve expertise in a skill"),
+    ("Boss Challenge: Impact", "Make a significant positive impact"),
+)
 
 
 # ============================================================================
@@ -69,26 +209,36 @@ class Buff:
     duration_days: int
     applied_date: str
     multiplier: float = 1.0  # XP multiplier for certain buffs
+    # End day while an ExpiryScheduler owns expiry (duration_days is then
+    # not counted down)
+    expires_day: Optional[int] = None
 
     def is_active(self, current_day: int) -> bool:
         """Check if buff is still active."""
         return self.duration_days > 0
 
-    def apply_xp_modifier(self, xp: float) -> float:
+    def apply_xp_modifier(self, xp: float, config: GameConfig = DEFAULT_CONFIG) -> float:
         """Apply XP modifier if applicable."""
         if self.buff_type == BuffType.DOUBLE_XP:
             return xp * 2
         elif self.buff_type == BuffType.FATIGUE:
-            return xp * FATIGUE_XP_PENALTY
+            return xp * config.fatigue_xp_penalty
         elif self.buff_type == BuffType.STREAK_BONUS:
-            return xp * STREAK_BONUS_MULTIPLIER
+            return xp * config.streak_bonus_multiplier
         return xp
 
-    def to_dict(self):
-        """Convert to dictionary for JSON output."""
+    def to_dict(self, current_day: Optional[int] = None):
+        """Convert to dictionary for JSON output.
+
+        With a scheduled end day, the remaining duration is derived from
+        it and `current_day`.
+        """
+        duration = self.duration_days
+        if self.expires_day is not None and current_day is not None:
+            duration = self.expires_day - current_day
         return {
             "type": self.buff_type.value,
-            "duration_days": self.duration_days,
+            "duration_days": duration,
             "applied_date": self.applied_date
         }
 
@@ -143,6 +293,111 @@ class Stats:
         }
 
 
+@dataclass
+class DifficultyModel:
+    """Incrementally updated completion model used to pick quest difficulty.
+
+    Every rate is an exponentially weighted moving average seeded with the
+    target rate, so a new player gets the original uniform mix. Updates and
+    weight lookups are O(1); quest history is never rescanned.
+    """
+    overall_rate: float = ADAPTIVE_TARGET_COMPLETION
+    difficulty_rates: Dict[str, float] = field(default_factory=dict)
+    type_rates: Dict[str, float] = field(default_factory=dict)
+    template_rates: Dict[str, float] = field(default_factory=dict)
+    recent_streak: int = 0  # +n consecutive completions, -n consecutive misses
+    observations: int = 0
+
+    def record(self, quest: "Quest", completed: bool):
+        """Fold one quest outcome into the model."""
+        outcome = 1.0 if completed else 0.0
+        alpha = ADAPTIVE_LEARNING_RATE
+        self.overall_rate += alpha * (outcome - self.overall_rate)
+        for rates, key in ((self.difficulty_rates, quest.difficulty.value),
+                           (self.type_rates, quest.quest_type.value),
+                           (self.template_rates, quest.title)):
+            rate = rates.get(key, ADAPTIVE_TARGET_COMPLETION)
+            rates[key] = rate + alpha * (outcome - rate)
+        if completed:
+            self.recent_streak = self.recent_streak + 1 if self.recent_streak > 0 else 1
+        else:
+            self.recent_streak = self.recent_streak - 1 if self.recent_streak < 0 else -1
+        self.observations += 1
+
+    def record_misses(self, counts: Dict["QuestType", int]):
+        """Fold in missed quests known only by type, e.g. days a player skipped.
+
+        A run of misses shrinks each rate geometrically, so this is O(1) in
+        the number of misses. Difficulty and template rates are untouched.
+        """
+        total = sum(counts.values())
+        keep = 1 - ADAPTIVE_LEARNING_RATE
+        self.overall_rate *= keep ** total
+        for quest_type, count in counts.items():
+            rate = self.type_rates.get(quest_type.value, ADAPTIVE_TARGET_COMPLETION)
+            self.type_rates[quest_type.value] = rate * keep ** count
+        self.recent_streak = min(self.recent_streak, 0) - total
+        self.observations += total
+
+    def difficulty_weights(self, difficulties,
+                           quest_type: Optional["QuestType"] = None) -> List[float]:
+        """Sampling weights for EASY..HARD, easing off for struggling players.
+
+        The shift follows the player's completion rate for `quest_type`
+        (falling back to the overall rate), so missed boss quests do not
+        make daily quests easier.
+        """
+        rate = self.overall_rate
+        if quest_type is not None:
+            rate = self.type_rates.get(quest_type.value, rate)
+        shift = (rate - ADAPTIVE_TARGET_COMPLETION) / ADAPTIVE_TARGET_COMPLETION
+        shift = max(-1.0, min(1.0, shift))
+        # Below target, weight moves from the hard end to the easy end
+        ladder = {Difficulty.EASY: 1 - shift, Difficulty.MEDIUM: 1.0, Difficulty.HARD: 1 + shift}
+        weights = []
+        for difficulty in difficulties:
+            rate = self.difficulty_rates.get(difficulty.value, ADAPTIVE_TARGET_COMPLETION)
+            fit = max(0.25, min(1.25, rate / ADAPTIVE_TARGET_COMPLETION))
+            weight = max(0.1, ladder.get(difficulty, 1.0)) * fit
+            if difficulty == Difficulty.HARD:
+                if self.recent_streak <= -2:
+                    weight *= 0.5
+                elif self.recent_streak >= 3:
+                    weight *= 1.25
+            weights.append(weight)
+        return weights
+
+    def template_weights(self, titles) -> List[float]:
+        """Sampling weights favoring templates this player tends to finish."""
+        return [0.25 + self.template_rates.get(title, ADAPTIVE_TARGET_COMPLETION)
+                for title in titles]
+
+    def copy(self) -> "DifficultyModel":
+        """Independent copy (the rate dictionaries are small and bounded)."""
+        return replace(
+            self,
+            difficulty_rates=dict(self.difficulty_rates),
+            type_rates=dict(self.type_rates),
+            template_rates=dict(self.template_rates)
+        )
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output or persistence."""
+        return {
+            "overall_rate": self.overall_rate,
+            "difficulty_rates": dict(self.difficulty_rates),
+            "type_rates": dict(self.type_rates),
+            "template_rates": dict(self.template_rates),
+            "recent_streak": self.recent_streak,
+            "observations": self.observations
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DifficultyModel":
+        """Rebuild a model saved with to_dict()."""
+        return cls(**data)
+
+
 @dataclass
 class Player:
     """Main player entity."""
@@ -154,38 +409,164 @@ class Player:
     active_buffs: List[Buff] = field(default_factory=list)
     completed_quests_count: int = 0
     missed_quests_streak: int = 0
+    quest_streak: int = 0  # Consecutive completions, reset on a miss
     current_day: int = 1
     last_quest_missed: bool = False
+    # Lives with the player so it is saved and snapshotted along with it
+    difficulty_model: DifficultyModel = field(default_factory=DifficultyModel)
 
-    def to_dict(self):
+    def to_dict(self, xp_per_level: int = XP_PER_LEVEL):
         """Convert to dictionary for JSON output."""
         return {
             "name": self.name,
             "level": self.level,
             "xp": self.xp,
-            "xp_to_next_level": max(0, XP_PER_LEVEL - (self.xp % XP_PER_LEVEL)),
+            "xp_to_next_level": max(0, xp_per_level - (self.xp % xp_per_level)),
             "total_xp_earned": self.total_xp_earned,
             "stats": self.stats.to_dict(),
-            "active_buffs": [b.to_dict() for b in self.active_buffs],
+            "active_buffs": [b.to_dict(self.current_day) for b in self.active_buffs],
             "completed_quests_count": self.completed_quests_count,
             "missed_quests_streak": self.missed_quests_streak,
+            "quest_streak": self.quest_streak,
             "current_day": self.current_day
         }
 
+    def to_persist_dict(self, xp_per_level: int = XP_PER_LEVEL):
+        """Like to_dict(), plus the internal DifficultyModel, for saving.
+
+        The model is tuning state, not UI state, so it stays out of API
+        responses.
+        """
+        data = self.to_dict(xp_per_level)
+        data["difficulty_model"] = self.difficulty_model.to_dict()
+        return data
+
 
 @dataclass
 class GameState:
     """Tracks the entire game state."""
     player: Player
-    active_quests: List[Quest] = field(default_factory=list)
+    # Quests are never edited in place; the engine swaps in updated copies
+    active_quests: PersistentList = field(default_factory=PersistentList)
     quest_counter: int = 0  # For generating unique quest IDs
+    version: int = 0  # Bumped by the engine on every mutation
+    # Distinguishes state instances so a restarted engine never reuses an ETag
+    epoch: str = field(default_factory=lambda: format(time.time_ns(), "x"))
+
+    def __post_init__(self):
+        if not isinstance(self.active_quests, PersistentList):
+            self.active_quests = PersistentList(self.active_quests)
+
+    @property
+    def etag(self) -> str:
+        """Opaque tag that changes whenever the state changes."""
+        return f"{self.epoch}-{self.version}"
+
+    def to_dict(self, include_timestamp: bool = False, xp_per_level: int = XP_PER_LEVEL):
+        """Convert to dictionary for JSON output."""
+        data = {
+            "player": self.player.to_dict(xp_per_level),
+            "active_quests": [q.to_dict() for q in self.active_quests],
+            "version": self.version,
+            "etag": self.etag
+        }
+        if include_timestamp:
+            from datetime import datetime
+
+            data["timestamp"] = datetime.now().isoformat()
+        return data
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """Copy-on-write capture of a GameState (see GameEngine.snapshot).
+
+    The quest list is shared structurally and the buff list by reference;
+    only the fixed-size Player, Stats and DifficultyModel records are copied.
+    """
+    player: Player
+    stats: Stats
+    difficulty_model: DifficultyModel
+    quests: PersistentList
+    quest_counter: int
+    version: int
+    rng_state: tuple
+
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+# Upper bounds (microseconds) of command latency buckets
+LATENCY_BUCKETS_US = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000]
+
+
+class EngineMetrics:
+    """Opt-in counters and per-command latency histograms."""
+
+    def __init__(self):
+        """Start with all counters at zero."""
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded metrics."""
+        self.command_counts: Dict[str, int] = {}
+        self.command_latency: Dict[str, List[int]] = {}
+        self.command_time_us: Dict[str, float] = {}
+        self.quests_scanned = 0
+        self.buffs_evaluated = 0
+        self.json_bytes = 0
+
+    def record_command(self, command: str, elapsed_s: float, response_bytes: int):
+        """Record one handled command."""
+        elapsed_us = elapsed_s * 1_000_000
+        buckets = self.command_latency.get(command)
+        if buckets is None:
+            buckets = self.command_latency[command] = [0] * (len(LATENCY_BUCKETS_US) + 1)
+            self.command_counts[command] = 0
+            self.command_time_us[command] = 0.0
+        index = len(LATENCY_BUCKETS_US)
+        for i, bound in enumerate(LATENCY_BUCKETS_US):
+            if elapsed_us <= bound:
+                index = i
+                break
+        buckets[index] += 1
+        self.command_counts[command] += 1
+        self.command_time_us[command] += elapsed_us
+        self.json_bytes += response_bytes
+
+    def latency_percentile(self, command: str, p: float) -> Optional[int]:
+        """Return the bucket upper bound (us) containing the p-th percentile."""
+        buckets = self.command_latency.get(command)
+        if not buckets:
+            return None
+        rank = p / 100 * self.command_counts[command]
+        seen = 0
+        for i, count in enumerate(buckets):
+            seen += count
+            if count and seen >= rank:
+                return LATENCY_BUCKETS_US[i] if i < len(LATENCY_BUCKETS_US) else None
+        return None
 
     def to_dict(self):
         """Convert to dictionary for JSON output."""
+        commands = {}
+        for command, count in self.command_counts.items():
+            commands[command] = {
+                "count": count,
+                "mean_us": round(self.command_time_us[command] / count, 1),
+                "p50_us": self.latency_percentile(command, 50),
+                "p99_us": self.latency_percentile(command, 99),
+                "latency_buckets_us": dict(zip(
+                    [str(b) for b in LATENCY_BUCKETS_US] + ["inf"],
+                    self.command_latency[command]
+                ))
+            }
         return {
-            "player": self.player.to_dict(),
-            "active_quests": [q.to_dict() for q in self.active_quests],
-            "timestamp": datetime.now().isoformat()
+            "commands": commands,
+            "quests_scanned": self.quests_scanned,
+            "buffs_evaluated": self.buffs_evaluated,
+            "json_bytes": self.json_bytes
         }
 
 
@@ -193,14 +574,107 @@ class GameState:
 # GAME ENGINE
 # ============================================================================
 
+# Listener signature: listener(event, engine, payload)
+EventListener = Callable[[GameEvent, "GameEngine", Dict], None]
+
+
 class GameEngine:
     """Core game logic and mechanics."""
 
-    def __init__(self, player_name: str = "Hero"):
-        """Initialize the game engine with a player."""
+    def __init__(self, player_name: str = "Hero", instrument: bool = False,
+                 start_date=None, clock: Optional[Callable] = None,
+                 seed: Optional[int] = None, adaptive_difficulty: bool = True,
+                 config: Optional[GameConfig] = None):
+        """Initialize the game engine with a player.
+
+        `seed` makes quest generation and power-ups reproducible; each
+        engine draws from its own random.Random. With `adaptive_difficulty`
+        daily quests are drawn from the player's DifficultyModel instead of
+        uniformly. `config` overrides the balance constants (see GameConfig).
+
+        Passing `start_date` (a datetime.date for day 1) enables calendar
+        mode: the current day follows `clock()` (default date.today) and
+        owed rollovers are applied lazily whenever the player is touched.
+        """
         self.game_state = GameState(player=Player(name=player_name))
+        self.config = config or DEFAULT_CONFIG
+        self.rng = random.Random(seed)
+        self.adaptive_difficulty = adaptive_difficulty
+        # (snapshot, events emitted by the undoable action) pairs
+        self._history: deque = deque(maxlen=UNDO_HISTORY_DEPTH)
+        self._recorded: Optional[list] = None
+        self._listeners: List[EventListener] = []
+        # None when instrumentation is off; hot paths check this one attribute
+        self.metrics: Optional[EngineMetrics] = EngineMetrics() if instrument else None
+        self.start_date = start_date
+        if start_date is not None and clock is None:
+            from datetime import date
+
+            clock = date.today
+        self.clock = clock
+        self._rolling_over = False
+        # Set by ExpiryScheduler.attach; the day and expiry then come from its wheel
+        self.scheduler = None
+        self._pending_auto_missed = 0
+        self._last_auto_missed = 0
         self._generate_initial_quests()
 
+    # ========================================================================
+    # EVENTS
+    # ========================================================================
+
+    def subscribe(self, listener: EventListener):
+        """Register a listener called as listener(event, engine, payload).
+
+        Listeners run synchronously in the middle of the command that fired
+        the event and must not raise (see _emit).
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: EventListener):
+        """Remove a previously registered listener."""
+        self._listeners.remove(listener)
+
+    def on(self, event: GameEvent, hook: Callable[[Dict], None]) -> EventListener:
+        """Register a hook for one event type, called as hook(payload).
+
+        Returns the underlying listener so it can be unsubscribed.
+        """
+        def listener(fired: GameEvent, engine: "GameEngine", payload: Dict):
+            if fired == event:
+                hook(payload)
+
+        self.subscribe(listener)
+        return listener
+
+    def _emit(self, event: GameEvent, payload: Dict):
+        """Deliver an event to all listeners.
+
+        Callers guard with ``if self._listeners`` so that building the
+        payload costs nothing when nobody is subscribed. Exceptions are not
+        caught: one raised by a listener propagates out of the command with
+        the mutation partly applied and no undo checkpoint recorded, so
+        listeners that can fail (I/O sinks) must handle their own errors.
+        """
+        if self._recorded is not None:
+            self._recorded.append((event, payload, self.game_state.player.current_day))
+        for listener in self._listeners:
+            listener(event, self, payload)
+
+    # ========================================================================
+    # INSTRUMENTATION
+    # ========================================================================
+
+    def enable_instrumentation(self) -> EngineMetrics:
+        """Start collecting metrics (no-op if already enabled)."""
+        if self.metrics is None:
+            self.metrics = EngineMetrics()
+        return self.metrics
+
+    def disable_instrumentation(self):
+        """Stop collecting metrics and discard them."""
+        self.metrics = None
+
     # ========================================================================
     # QUEST GENERATION
     # ========================================================================
@@ -220,11 +694,15 @@ class GameEngine:
 
     def _generate_daily_quests(self):
         """Generate quests for the next day."""
-        # Remove old incomplete quests (except weekly boss)
-        self.game_state.active_quests = [
-            q for q in self.game_state.active_quests
-            if q.quest_type == QuestType.WEEKLY_BOSS or q.completed or q.missed
-        ]
+        # Remove old incomplete quests (except weekly boss). With a scheduler
+        # they were already expired by the timing wheel, so skip the scan.
+        if self.scheduler is None:
+            if self.metrics is not None:
+                self.metrics.quests_scanned += len(self.game_state.active_quests)
+            self.game_state.active_quests = PersistentList(
+                q for q in self.game_state.active_quests
+                if q.quest_type == QuestType.WEEKLY_BOSS or q.completed or q.missed
+            )
 
         # Generate 3 new daily quests
         for _ in range(3):
@@ -239,35 +717,18 @@ class GameEngine:
 
     def _create_daily_quest(self):
         """Create a single daily quest with random difficulty."""
-        difficulties = [Difficulty.EASY, Difficulty.MEDIUM, Difficulty.HARD]
-        difficulty = random.choice(difficulties)
-
-        quest_titles = {
-            Difficulty.EASY: [
-                "Drink 8 glasses of water",
-                "Do 10-minute meditation",
-                "Take a 20-minute walk",
-                "Write 3 journal entries",
-                "Read 10 pages"
-            ],
-            Difficulty.MEDIUM: [
-                "Complete 1 hour focused work",
-                "Workout for 30 minutes",
-                "Learn something new for 45 minutes",
-                "Organize your workspace",
-                "Prepare healthy meals for tomorrow"
-            ],
-            Difficulty.HARD: [
-                "Complete a major project milestone",
-                "Write 1000+ words of content",
-                "Master a new skill (2+ hours)",
-                "Deep clean your environment",
-                "Have 3 meaningful conversations"
-            ]
-        }
-
-        title = random.choice(quest_titles[difficulty])
-        xp = XP_REWARDS[difficulty]
+        if self.adaptive_difficulty:
+            model = self.game_state.player.difficulty_model
+            difficulty = self.rng.choices(
+                DAILY_QUEST_DIFFICULTIES,
+                model.difficulty_weights(DAILY_QUEST_DIFFICULTIES, QuestType.DAILY)
+            )[0]
+            titles = DAILY_QUEST_TITLES[difficulty]
+            title = self.rng.choices(titles, model.template_weights(titles))[0]
+        else:
+            difficulty = self.rng.choice(DAILY_QUEST_DIFFICULTIES)
+            title = self.rng.choice(DAILY_QUEST_TITLES[difficulty])
+        xp = self.config.xp_reward(difficulty)
 
         quest = Quest(
             quest_id=f"q{self.game_state.quest_counter}",
@@ -279,20 +740,18 @@ class GameEngine:
             created_day=self.game_state.player.current_day
         )
 
-        self.game_state.quest_counter += 1
-        self.game_state.active_quests.append(quest)
+        self._add_quest(quest)
 
     def _create_random_challenge(self):
         """Create a random challenge quest."""
-        challenges = [
-            ("Unexpected Opportunity", "Seize an unexpected opportunity"),
-            ("Challenge Accepted", "Face a personal challenge head-on"),
-            ("Help Someone", "Do an act of kindness"),
-            ("Quick Win", "Complete something you've been procrastinating on"),
-            ("Stretch Goal", "Do something outside your comfort zone"),
-        ]
-
-        title, description = random.choice(challenges)
+        if self.adaptive_difficulty:
+            model = self.game_state.player.difficulty_model
+            title, description = self.rng.choices(
+                RANDOM_CHALLENGES,
+                model.template_weights([title for title, _ in RANDOM_CHALLENGES])
+            )[0]
+        else:
+            title, description = self.rng.choice(RANDOM_CHALLENGES)
 
         quest = Quest(
             quest_id=f"q{self.game_state.quest_counter}",
@@ -300,24 +759,15 @@ class GameEngine:
             description=description,
             difficulty=Difficulty.MEDIUM,
             quest_type=QuestType.RANDOM,
-            xp_reward=XP_REWARDS[Difficulty.MEDIUM],
+            xp_reward=self.config.xp_reward(Difficulty.MEDIUM),
             created_day=self.game_state.player.current_day
         )
 
-        self.game_state.quest_counter += 1
-        self.game_state.active_quests.append(quest)
+        self._add_quest(quest)
 
     def _create_weekly_boss_quest(self):
         """Create a weekly boss quest (high difficulty)."""
-        boss_quests = [
-            ("Weekly Boss: Major Goal", "Complete your main weekly objective"),
-            ("Boss Challenge: Leadership", "Lead a team or group towards a goal"),
-            ("Boss Challenge: Innovation", "Create something new and meaningful"),
-            ("Boss Challenge: Mastery", "Achieve expertise in a skill"),
-            ("Boss Challenge: Impact", "Make a significant positive impact"),
-        ]
-
-        title, description = random.choice(boss_quests)
+        title, description = self.rng.choice(WEEKLY_BOSS_QUESTS)
 
         quest = Quest(
             quest_id=f"q{self.game_state.quest_counter}",
@@ -325,12 +775,18 @@ class GameEngine:
             description=description,
             difficulty=Difficulty.BOSS,
             quest_type=QuestType.WEEKLY_BOSS,
-            xp_reward=XP_REWARDS[Difficulty.BOSS],
+            xp_reward=self.config.xp_reward(Difficulty.BOSS),
             created_day=self.game_state.player.current_day
         )
 
+        self._add_quest(quest)
+
+    def _add_quest(self, quest: Quest):
+        """Add a newly created quest to the active list."""
         self.game_state.quest_counter += 1
         self.game_state.active_quests.append(quest)
+        if self.scheduler is not None:
+            self.scheduler.schedule_quest(self, quest)
 
     # ========================================================================
     # QUEST COMPLETION LOGIC
@@ -338,25 +794,39 @@ class GameEngine:
 
     def complete_quest(self, quest_id: str) -> Dict:
         """Mark a quest as completed and award XP."""
-        quest = self._find_quest(quest_id)
-        if not quest:
+        if self.start_date is not None:
+            self.sync_calendar()
+        return self._undoable(self._complete_quest, quest_id)
+
+    def _complete_quest(self, quest_id: str) -> Dict:
+        """Complete a quest without calendar sync or an undo checkpoint."""
+        index = self._find_quest_index(quest_id)
+        if index < 0:
             return {
                 "success": False,
                 "error": f"Quest '{quest_id}' not found"
             }
 
+        quest = self.game_state.active_quests[index]
         if quest.completed or quest.missed:
             return {
                 "success": False,
                 "error": f"Quest '{quest_id}' is already {quest.completed and 'completed' or 'missed'}"
             }
 
-        # Mark as completed
-        quest.completed = True
+        # Mark as completed (on a copy, so snapshots keep the old quest)
+        quest = replace(quest, completed=True)
+        self.game_state.active_quests[index] = quest
+        self.game_state.version += 1
+        if self.scheduler is not None:
+            self.scheduler.cancel_quest(self, quest_id)
+
+        self.game_state.player.difficulty_model.record(quest, completed=True)
 
         # Reset missed streak on successful completion
         self.game_state.player.missed_quests_streak = 0
         self.game_state.player.last_quest_missed = False
+        self.game_state.player.quest_streak += 1
 
         # Award XP
         xp_to_award = quest.xp_reward
@@ -368,48 +838,73 @@ class GameEngine:
         self.game_state.player.completed_quests_count += 1
 
         # Check for level up
-        level_ups = self.game_state.player.xp // XP_PER_LEVEL
+        level_ups = self.game_state.player.xp // self.config.xp_per_level
+        old_level = self.game_state.player.level
         if level_ups > 0:
-            old_level = self.game_state.player.level
             self.game_state.player.level += level_ups
-            self.game_state.player.xp %= XP_PER_LEVEL
+            self.game_state.player.xp %= self.config.xp_per_level
 
         # Update stats based on quest difficulty
         self._update_stats_on_quest_complete(quest)
 
+        if self._listeners:
+            self._emit(GameEvent.QUEST_COMPLETED, {
+                "quest": quest,
+                "xp_awarded": xp_to_award
+            })
+            if level_ups > 0:
+                self._emit(GameEvent.LEVEL_UP, {
+                    "old_level": old_level,
+                    "new_level": self.game_state.player.level
+                })
+
         return {
             "success": True,
             "quest_completed": quest.to_dict(),
             "xp_awarded": xp_to_award,
-            "player_stats": self.game_state.player.to_dict()
+            "player_stats": self.game_state.player.to_dict(self.config.xp_per_level)
         }
 
     def miss_quest(self, quest_id: str) -> Dict:
         """Mark a quest as missed and apply penalties."""
-        quest = self._find_quest(quest_id)
-        if not quest:
+        if self.start_date is not None:
+            self.sync_calendar()
+        return self._undoable(self._miss_quest, quest_id)
+
+    def _miss_quest(self, quest_id: str) -> Dict:
+        """Miss a quest without calendar sync or an undo checkpoint."""
+        index = self._find_quest_index(quest_id)
+        if index < 0:
             return {
                 "success": False,
                 "error": f"Quest '{quest_id}' not found"
             }
 
+        quest = self.game_state.active_quests[index]
         if quest.completed or quest.missed:
             return {
                 "success": False,
                 "error": f"Quest '{quest_id}' is already {quest.completed and 'completed' or 'missed'}"
             }
 
-        # Mark as missed
-        quest.missed = True
+        # Mark as missed (on a copy, so snapshots keep the old quest)
+        quest = replace(quest, missed=True)
+        self.game_state.active_quests[index] = quest
+        self.game_state.version += 1
+        if self.scheduler is not None:
+            self.scheduler.cancel_quest(self, quest_id)
+
+        self.game_state.player.difficulty_model.record(quest, completed=False)
 
         # Apply penalty
-        xp_penalty = MISSED_QUEST_PENALTY
+        xp_penalty = self.config.missed_quest_penalty
         self.game_state.player.xp = max(0, self.game_state.player.xp + xp_penalty)
         self.game_state.player.total_xp_earned += xp_penalty
 
         # Update streak
         self.game_state.player.missed_quests_streak += 1
         self.game_state.player.last_quest_missed = True
+        self.game_state.player.quest_streak = 0
 
         # Check if fatigue debuff should be triggered
         if self.game_state.player.missed_quests_streak >= 2:
@@ -418,26 +913,43 @@ class GameEngine:
         # Update stats
         self._update_stats_on_quest_miss(quest)
 
+        if self._listeners:
+            self._emit(GameEvent.QUEST_MISSED, {
+                "quest": quest,
+                "xp_penalty": xp_penalty
+            })
+
         return {
             "success": True,
             "quest_missed": quest.to_dict(),
             "xp_penalty": xp_penalty,
             "missed_streak": self.game_state.player.missed_quests_streak,
-            "player_stats": self.game_state.player.to_dict()
+            "player_stats": self.game_state.player.to_dict(self.config.xp_per_level)
         }
 
     def _find_quest(self, quest_id: str) -> Optional[Quest]:
         """Find a quest by ID."""
-        for quest in self.game_state.active_quests:
+        index = self._find_quest_index(quest_id)
+        return self.game_state.active_quests[index] if index >= 0 else None
+
+    def _find_quest_index(self, quest_id: str) -> int:
+        """Find a quest's position in the active list, or -1."""
+        for index, quest in enumerate(self.game_state.active_quests):
             if quest.quest_id == quest_id:
-                return quest
-        return None
+                if self.metrics is not None:
+                    self.metrics.quests_scanned += index + 1
+                return index
+        if self.metrics is not None:
+            self.metrics.quests_scanned += len(self.game_state.active_quests)
+        return -1
 
     def _apply_buffs_to_xp(self, xp: float) -> float:
         """Apply active buffs' XP modifiers."""
+        if self.metrics is not None:
+            self.metrics.buffs_evaluated += len(self.game_state.player.active_buffs)
         for buff in self.game_state.player.active_buffs:
             if buff.is_active(self.game_state.player.current_day):
-                xp = buff.apply_xp_modifier(xp)
+                xp = buff.apply_xp_modifier(xp, self.config)
         return xp
 
     def _update_stats_on_quest_complete(self, quest: Quest):
@@ -463,11 +975,11 @@ class GameEngine:
             current = getattr(self.game_state.player.stats, attr)
             setattr(self.game_state.player.stats, attr, min(100, current))
 
-    def _update_stats_on_quest_miss(self, quest: Quest):
-        """Update player stats when quest is missed."""
-        self.game_state.player.stats.consistency -= 5
-        self.game_state.player.stats.energy -= 3
-        self.game_state.player.stats.discipline -= 3
+    def _update_stats_on_quest_miss(self, quest: Optional[Quest], count: int = 1):
+        """Update player stats when quest is missed (`count` times over)."""
+        self.game_state.player.stats.consistency -= 5 * count
+        self.game_state.player.stats.energy -= 3 * count
+        self.game_state.player.stats.discipline -= 3 * count
 
         # Floor stats at 0
         for attr in ['health', 'energy', 'focus', 'discipline', 'productivity', 'consistency']:
@@ -487,16 +999,18 @@ class GameEngine:
 
         fatigue = Buff(
             buff_type=BuffType.FATIGUE,
-            duration_days=FATIGUE_DEBUFF_DURATION,
+            duration_days=self.config.fatigue_debuff_duration,
             applied_date=str(self.game_state.player.current_day)
         )
 
-        self.game_state.player.active_buffs.append(fatigue)
+        self._add_buff(fatigue)
 
     def apply_random_powerup(self):
         """Randomly apply a power-up buff."""
+        if self.start_date is not None:
+            self.sync_calendar()
         powerups = [BuffType.FOCUS_MODE, BuffType.DOUBLE_XP]
-        powerup = random.choice(powerups)
+        powerup = self.rng.choice(powerups)
 
         buff = Buff(
             buff_type=powerup,
@@ -504,17 +1018,52 @@ class GameEngine:
             applied_date=str(self.game_state.player.current_day)
         )
 
-        self.game_state.player.active_buffs.append(buff)
+        self._add_buff(buff)
         return buff
 
-    def _decay_buffs(self):
-        """Decrease buff durations and remove expired ones."""
-        for buff in self.game_state.player.active_buffs:
-            buff.duration_days -= 1
+    def _add_buff(self, buff: Buff):
+        """Attach a buff to the player."""
+        # Rebind rather than append: snapshots share the old list
+        self.game_state.player.active_buffs = self.game_state.player.active_buffs + [buff]
+        self.game_state.version += 1
+        if self.scheduler is not None:
+            self.scheduler.schedule_buff(self, buff)
+
+        if self._listeners:
+            self._emit(GameEvent.BUFF_APPLIED, {"buff": buff})
+
+    def expire_buff(self, buff: Buff):
+        """Remove a buff whose end time has come (used by ExpiryScheduler)."""
+        buffs = self.game_state.player.active_buffs
+        remaining = [b for b in buffs if b is not buff]
+        if len(remaining) == len(buffs):
+            return
+        self.game_state.player.active_buffs = remaining
+        self.game_state.version += 1
+
+        if self._listeners:
+            self._emit(GameEvent.BUFF_EXPIRED, {"buff": buff})
+
+    def _decay_buffs(self, days: int = 1):
+        """Decrease buff durations by `days` and remove expired ones."""
+        if days <= 0:
+            return
+        if self.metrics is not None:
+            self.metrics.buffs_evaluated += len(self.game_state.player.active_buffs)
+        # Decayed copies, so snapshots keep the old durations
+        decayed = [
+            replace(b, duration_days=b.duration_days - days)
+            for b in self.game_state.player.active_buffs
+        ]
 
         # Remove expired buffs
+        if self._listeners:
+            for buff in decayed:
+                if buff.duration_days <= 0:
+                    self._emit(GameEvent.BUFF_EXPIRED, {"buff": buff})
+
         self.game_state.player.active_buffs = [
-            b for b in self.game_state.player.active_buffs
+            b for b in decayed
             if b.duration_days > 0
         ]
 
@@ -524,7 +1073,144 @@ class GameEngine:
 
     def next_day(self) -> Dict:
         """Advance to the next day and generate new quests."""
+        return self._undoable(self._next_day)
+
+    def _next_day(self) -> Dict:
+        """Advance one day without an undo checkpoint."""
+        if self.start_date is not None:
+            return {
+                "success": False,
+                "error": "Calendar mode: days advance with the clock, not next_day"
+            }
+
+        auto_missed = self._advance_day()
+
+        return {
+            "success": True,
+            "message": f"Advanced to Day {self.game_state.player.current_day}",
+            "incomplete_quests_auto_missed": auto_missed,
+            "game_state": self.game_state.to_dict(xp_per_level=self.config.xp_per_level)
+        }
+
+    def sync_calendar(self) -> int:
+        """Apply every rollover owed by the clock (calendar mode only).
+
+        Returns the number of days advanced. Inactive players cost nothing
+        until they are touched again; a returning player catches up here in
+        one step (see _catch_up), however long they were away. Undo history
+        is cleared by a rollover: the clock cannot be undone.
+        """
+        if self.start_date is None or self._rolling_over:
+            return 0
+        target_day = (self.clock() - self.start_date).days + 1
+        owed = target_day - self.game_state.player.current_day
+        if owed <= 0:
+            return 0
+
+        self._rolling_over = True
+        try:
+            if owed == 1:
+                self._advance_day()
+            else:
+                self._catch_up(owed)
+        finally:
+            self._rolling_over = False
+        self._history.clear()
+        return owed
+
+    def _catch_up(self, days: int) -> int:
+        """Roll over several days at once; return the number of auto-missed quests.
+
+        Matches `days` unplayed calls to _advance_day(), except that quests
+        are only generated for the day the player returns to. The open
+        quests are auto-missed once; the daily quests and random challenge
+        of each day in between, which would all have been missed, are
+        charged without being created, and their weekly bosses are skipped.
+        Buffs are counted down arithmetically; fatigue, re-applied every
+        `fatigue_debuff_duration` days while the player is away, ends up in
+        the phase the day-by-day rollovers would leave it in. Power-ups last
+        one day, so only the final day's roll is made.
+        """
+        player = self.game_state.player
+        if self.metrics is not None:
+            self.metrics.quests_scanned += len(self.game_state.active_quests)
+        incomplete_quests = [
+            q for q in self.game_state.active_quests
+            if not q.completed and not q.missed and q.quest_type != QuestType.WEEKLY_BOSS
+        ]
+        for quest in incomplete_quests:
+            self._miss_quest(quest.quest_id)
+        self._decay_buffs()
+
+        # Every later rollover misses 4 quests, so fatigue lapses and is
+        # re-applied every `duration` rollovers from the first one it is absent
+        skipped = days - 1
+        self._charge_missed_quests({QuestType.DAILY: 3 * skipped, QuestType.RANDOM: skipped})
+        duration = self.config.fatigue_debuff_duration
+        fatigue_left = max((b.duration_days for b in player.active_buffs
+                            if b.buff_type == BuffType.FATIGUE), default=0)
+        self._decay_buffs(skipped)
+        first = 2 + fatigue_left  # rollovers are numbered 1..days
+        if duration > 0 and first <= days:
+            last = first + (days - first) // duration * duration
+            remaining = duration - 1 - (days - last)
+            if remaining > 0:
+                self._add_buff(Buff(
+                    buff_type=BuffType.FATIGUE,
+                    duration_days=remaining,
+                    applied_date=str(player.current_day + last - 1)
+                ))
+
+        player.current_day += days
+        self.game_state.version += 1
+        self._generate_daily_quests()
+
+        if self.rng.random() < 0.1:
+            self.apply_random_powerup()
+
+        auto_missed = len(incomplete_quests) + 4 * skipped
+        if self._listeners:
+            self._emit(GameEvent.DAY_ADVANCED, {
+                "day": player.current_day,
+                "auto_missed": auto_missed
+            })
+
+        return auto_missed
+
+    def _charge_missed_quests(self, counts: Dict[QuestType, int]):
+        """Apply the penalties of missed quests that were never created."""
+        count = sum(counts.values())
+        if count <= 0:
+            return
+        player = self.game_state.player
+        penalty = self.config.missed_quest_penalty * count
+        player.xp = max(0, player.xp + penalty)
+        player.total_xp_earned += penalty
+        player.missed_quests_streak += count
+        player.last_quest_missed = True
+        player.quest_streak = 0
+        player.difficulty_model.record_misses(counts)
+        self._update_stats_on_quest_miss(None, count)
+        self.game_state.version += 1
+
+    def expire_quest(self, quest_id: str):
+        """Auto-miss a quest whose deadline passed (used by ExpiryScheduler)."""
+        quest = self._find_quest(quest_id)
+        if quest is None or quest.completed or quest.missed:
+            return
+        self._miss_quest(quest_id)
+        self._pending_auto_missed += 1
+
+    def _advance_day(self) -> int:
+        """Roll over one day; return the number of auto-missed quests."""
+        if self.scheduler is not None:
+            # The scheduler owns the day: this rolls over every attached engine
+            self.scheduler.next_day()
+            return self._last_auto_missed
+
         # Handle incomplete quests from previous day
+        if self.metrics is not None:
+            self.metrics.quests_scanned += len(self.game_state.active_quests)
         incomplete_quests = [
             q for q in self.game_state.active_quests
             if not q.completed and not q.missed and q.quest_type != QuestType.WEEKLY_BOSS
@@ -532,45 +1218,193 @@ class GameEngine:
 
         # Mark incomplete quests as missed
         for quest in incomplete_quests:
-            self.miss_quest(quest.quest_id)
+            self._miss_quest(quest.quest_id)
 
         # Decay buffs
         self._decay_buffs()
 
         # Advance day
         self.game_state.player.current_day += 1
+        self.game_state.version += 1
 
         # Generate new quests
         self._generate_daily_quests()
 
         # Occasionally grant random power-up (10% chance)
-        if random.random() < 0.1:
+        if self.rng.random() < 0.1:
             self.apply_random_powerup()
 
+        if self._listeners:
+            self._emit(GameEvent.DAY_ADVANCED, {
+                "day": self.game_state.player.current_day,
+                "auto_missed": len(incomplete_quests)
+            })
+
+        return len(incomplete_quests)
+
+    def scheduled_rollover(self) -> int:
+        """Start the scheduler's new day (called by ExpiryScheduler once per tick).
+
+        The shared timing wheel has already expired what was due, so there
+        is no scan of the quest list and no per-buff countdown.
+        """
+        auto_missed = self._pending_auto_missed
+        self._pending_auto_missed = 0
+        self._last_auto_missed = auto_missed
+
+        self.game_state.player.current_day += 1
+        self.game_state.version += 1
+        self._generate_daily_quests()
+
+        if self.rng.random() < 0.1:
+            self.apply_random_powerup()
+
+        if self._listeners:
+            self._emit(GameEvent.DAY_ADVANCED, {
+                "day": self.game_state.player.current_day,
+                "auto_missed": auto_missed
+            })
+
+        return auto_missed
+
+    # ========================================================================
+    # SNAPSHOTS, PREVIEW & UNDO
+    # ========================================================================
+
+    def snapshot(self) -> StateSnapshot:
+        """Capture the current state in O(1) (quests are shared, not copied)."""
+        state = self.game_state
+        return StateSnapshot(
+            player=replace(state.player),
+            stats=replace(state.player.stats),
+            difficulty_model=state.player.difficulty_model.copy(),
+            quests=state.active_quests.fork(),
+            quest_counter=state.quest_counter,
+            version=state.version,
+            rng_state=self.rng.getstate()
+        )
+
+    def _restore(self, snapshot: StateSnapshot):
+        """Return the state to a snapshot; the snapshot stays reusable.
+
+        The Player object is updated in place so outside references to it
+        remain valid. The caller decides what version the result gets.
+        """
+        state = self.game_state
+        vars(state.player).update(vars(snapshot.player))
+        state.player.stats = replace(snapshot.stats)
+        state.player.difficulty_model = snapshot.difficulty_model.copy()
+        state.active_quests = snapshot.quests.fork()
+        state.quest_counter = snapshot.quest_counter
+        self.rng.setstate(snapshot.rng_state)
+
+    def _undoable(self, action: Callable[..., Dict], *args) -> Dict:
+        """Run a mutating action, remembering the prior state if it succeeds."""
+        if self.scheduler is not None:
+            return action(*args)
+        snapshot = self.snapshot()
+        # Keep the action's events so undo can tell listeners what to reverse
+        self._recorded = [] if self._listeners else None
+        try:
+            result = action(*args)
+            recorded = self._recorded
+        finally:
+            self._recorded = None
+        if result.get("success"):
+            self._history.append((snapshot, recorded or []))
+        return result
+
+    def preview(self, command: str, *args) -> Dict:
+        """Show the result of quest_complete/quest_miss/next_day without applying it.
+
+        Listeners, metrics and the scheduler are bypassed and the state,
+        version and random generator are restored afterwards.
+        """
+        actions = {
+            "quest_complete": (self._complete_quest, 1),
+            "quest_miss": (self._miss_quest, 1),
+            "next_day": (self._next_day, 0),
+        }
+        if command not in actions:
+            return {
+                "success": False,
+                "error": f"Cannot preview '{command}'. Choose from {sorted(actions)}"
+            }
+        action, arity = actions[command]
+        if len(args) != arity:
+            return {"success": False, "error": f"'{command}' takes {arity} argument(s)"}
+
+        if self.start_date is not None:
+            self.sync_calendar()
+        snapshot = self.snapshot()
+        level_before = self.game_state.player.level
+        saved = (self._listeners, self.metrics, self.scheduler)
+        self._listeners, self.metrics, self.scheduler = [], None, None
+        try:
+            result = action(*args)
+            result["would_reach_level"] = self.game_state.player.level
+            result["would_level_up"] = self.game_state.player.level > level_before
+        finally:
+            self._restore(snapshot)
+            self.game_state.version = snapshot.version
+            self._listeners, self.metrics, self.scheduler = saved
+        result["preview"] = True
+        return result
+
+    def undo(self) -> Dict:
+        """Roll back the most recent successful quest_complete/quest_miss/next_day.
+
+        Listeners receive STATE_RESTORED with "undone_events": the
+        (event, payload, day) triples the undone action emitted, in
+        emission order, so derived aggregates can be reversed.
+        """
+        if self.scheduler is not None:
+            return {"success": False, "error": "Undo is not available with an ExpiryScheduler"}
+        if self.start_date is not None:
+            self.sync_calendar()
+        if not self._history:
+            return {"success": False, "error": "Nothing to undo"}
+
+        version = self.game_state.version
+        snapshot, undone_events = self._history.pop()
+        self._restore(snapshot)
+        self.game_state.version = version + 1
+
+        if self._listeners:
+            self._emit(GameEvent.STATE_RESTORED, {"undone_events": undone_events})
+
         return {
             "success": True,
-            "message": f"Advanced to Day {self.game_state.player.current_day}",
-            "incomplete_quests_auto_missed": len(incomplete_quests),
-            "game_state": self.game_state.to_dict()
+            "undo_remaining": len(self._history),
+            "player_stats": self.game_state.player.to_dict(self.config.xp_per_level)
         }
 
     # ========================================================================
     # QUERY METHODS
     # ========================================================================
 
-    def get_status(self) -> Dict:
+    def get_status(self, include_timestamp: bool = False) -> Dict:
         """Get current game status."""
-        return self.game_state.to_dict()
+        if self.start_date is not None:
+            self.sync_calendar()
+        return self.game_state.to_dict(include_timestamp, self.config.xp_per_level)
 
     def get_player_status(self) -> Dict:
         """Get player status only."""
-        return self.game_state.player.to_dict()
+        if self.start_date is not None:
+            self.sync_calendar()
+        data = self.game_state.player.to_dict(self.config.xp_per_level)
+        data["etag"] = self.game_state.etag
+        return data
 
     def get_active_quests(self) -> Dict:
         """Get list of active quests."""
+        if self.start_date is not None:
+            self.sync_calendar()
         return {
             "total_quests": len(self.game_state.active_quests),
-            "quests": [q.to_dict() for q in self.game_state.active_quests]
+            "quests": [q.to_dict() for q in self.game_state.active_quests],
+            "etag": self.game_state.etag
         }
 
 
@@ -581,11 +1415,43 @@ class GameEngine:
 class CLIInterface:
     """Command-line interface for the game."""
 
-    def __init__(self, player_name: str = "Hero"):
-        """Initialize CLI with a game engine."""
-        self.engine = GameEngine(player_name)
+    COMMANDS = (
+        "next_day", "quest_complete", "quest_miss", "status",
+        "quests", "player", "stats", "preview", "undo", "help", "exit"
+    )
+    # Read-only queries whose responses depend only on the game state
+    CACHEABLE_COMMANDS = ("status", "quests", "player")
+
+    def __init__(self, player_name: str = "Hero", instrument: bool = False,
+                 indent: Optional[int] = 2, include_timestamp: bool = False,
+                 seed: Optional[int] = None):
+        """Initialize CLI; the game engine is built on first access.
+
+        `seed` is passed to the GameEngine for reproducible quests.
+        """
+        self.player_name = player_name
+        self.instrument = instrument
+        self.seed = seed
+        self.indent = indent  # None gives single-line JSON responses
+        self.include_timestamp = include_timestamp
+        self._engine: Optional[GameEngine] = None
+        # Query command -> (etag, serialized response)
+        self._response_cache: Dict[str, Tuple[str, str]] = {}
         self.running = True
 
+    @property
+    def engine(self) -> GameEngine:
+        """The game engine, constructed lazily."""
+        if self._engine is None:
+            self._engine = GameEngine(self.player_name, seed=self.seed,
+                                      instrument=self.instrument)
+        return self._engine
+
+    @engine.setter
+    def engine(self, engine: GameEngine):
+        self._engine = engine
+        self._response_cache.clear()
+
     def handle_command(self, command: str) -> str:
         """Parse and execute a command, return JSON response."""
         parts = command.strip().split()
@@ -594,7 +1460,56 @@ class CLIInterface:
             return self._json_response({"error": "No command provided"})
 
         cmd = parts[0].lower()
-
+        engine = self.engine
+        if engine.metrics is not None:
+            started = time.perf_counter()
+        if engine._listeners:
+            engine._emit(GameEvent.PRE_COMMAND, {"command": cmd, "args": parts[1:]})
+
+        if cmd in self.CACHEABLE_COMMANDS:
+            result, response = self._cached_query(cmd, parts)
+        else:
+            result = self._dispatch(cmd, parts)
+            response = self._json_response(result)
+
+        if engine._listeners:
+            # result is None when a cached response was reused
+            engine._emit(GameEvent.POST_COMMAND, {"command": cmd, "result": result})
+        if engine.metrics is not None:
+            # Bucket unknown commands together so the metric keys stay bounded
+            name = cmd if cmd in self.COMMANDS else "unknown"
+            # json.dumps escapes non-ASCII by default, so len() counts bytes
+            engine.metrics.record_command(name, time.perf_counter() - started, len(response))
+
+        return response
+
+    def _cached_query(self, cmd: str, parts: List[str]) -> Tuple[Optional[Dict], str]:
+        """Answer a read-only query, reusing the last response if nothing changed.
+
+        A trailing argument equal to the current ETag (e.g. `status <etag>`)
+        gets a short "not modified" response instead of the full payload.
+        Returns (result, response); result is None on a cache hit.
+        """
+        # Owed calendar rollovers change the state, so apply them first
+        self.engine.sync_calendar()
+        etag = self.engine.game_state.etag
+        if len(parts) > 1 and parts[1] == etag:
+            result = {"not_modified": True, "etag": etag}
+            return result, self._json_response(result)
+
+        cacheable = not (cmd == "status" and self.include_timestamp)
+        cached = self._response_cache.get(cmd)
+        if cacheable and cached is not None and cached[0] == etag:
+            return None, cached[1]
+
+        result = self._dispatch(cmd, parts)
+        response = self._json_response(result)
+        if cacheable:
+            self._response_cache[cmd] = (etag, response)
+        return result, response
+
+    def _dispatch(self, cmd: str, parts: List[str]) -> Dict:
+        """Execute a parsed command and return the result dictionary."""
         if cmd == "next_day":
             result = self.engine.next_day()
         elif cmd == "quest_complete" and len(parts) > 1:
@@ -604,11 +1519,17 @@ class CLIInterface:
             quest_id = parts[1]
             result = self.engine.miss_quest(quest_id)
         elif cmd == "status":
-            result = self.engine.get_status()
+            result = self.engine.get_status(self.include_timestamp)
         elif cmd == "quests":
             result = self.engine.get_active_quests()
         elif cmd == "player":
             result = self.engine.get_player_status()
+        elif cmd == "preview" and len(parts) > 1:
+            result = self.engine.preview(parts[1].lower(), *parts[2:])
+        elif cmd == "undo":
+            result = self.engine.undo()
+        elif cmd == "stats":
+            result = self._get_stats()
         elif cmd == "help":
             result = self._get_help()
         elif cmd == "exit":
@@ -617,11 +1538,25 @@ class CLIInterface:
         else:
             result = {"error": f"Unknown command: {cmd}. Type 'help' for available commands."}
 
-        return self._json_response(result)
+        return result
 
     def _json_response(self, data: Dict) -> str:
         """Format data as pretty JSON."""
-        return json.dumps(data, indent=2)
+        import json
+
+        return json.dumps(data, indent=self.indent)
+
+    def _get_stats(self) -> Dict:
+        """Return instrumentation metrics, if enabled."""
+        if self.engine.metrics is None:
+            return {
+                "instrumentation_enabled": False,
+                "error": "Instrumentation is disabled. Create the CLI with instrument=True."
+            }
+        return {
+            "instrumentation_enabled": True,
+            **self.engine.metrics.to_dict()
+        }
 
     def _get_help(self) -> Dict:
         """Return help information."""
@@ -630,9 +1565,12 @@ class CLIInterface:
                 "next_day": "Advance to the next day, auto-miss incomplete quests, generate new quests",
                 "quest_complete <quest_id>": "Complete a quest and gain XP",
                 "quest_miss <quest_id>": "Mark a quest as missed (apply penalties)",
-                "status": "Get full game status (player, quests, buffs)",
-                "quests": "List all active quests",
-                "player": "Get player status only",
+                "status [etag]": "Get full game status (player, quests, buffs); not_modified if etag matches",
+                "quests [etag]": "List all active quests; not_modified if etag matches",
+                "player [etag]": "Get player status only; not_modified if etag matches",
+                "preview <command> [quest_id]": "Show what quest_complete/quest_miss/next_day would do, without applying it",
+                "undo": "Roll back the last quest_complete, quest_miss or next_day",
+                "stats": "Dump instrumentation metrics (latency, quests scanned, bytes)",
                 "help": "Show this help message",
                 "exit": "Exit the game"
             },
@@ -657,7 +1595,7 @@ class CLIInterface:
                 print("\n\nGame interrupted. Goodbye!")
                 break
             except Exception as e:
-                print(json.dumps({"error": str(e)}, indent=2))
+                print(self._json_response({"error": str(e)}))
 
 
 # ============================================================================
@@ -0,0 +1,283 @@
+"""
+Life RPG Leaderboard
+Cross-player rankings maintained incrementally from engine events.
+
+Architecture:
+- RankedSkipList: Indexable skip list (O(log n) insert/remove/rank/select)
+- Leaderboard: One ranked list per board, fed by GameEngine listeners
+"""
+
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+from life_rpg_game_master import GameEngine, GameEvent, Player
+
+
+# ============================================================================
+# RANKED SKIP LIST
+# ============================================================================
+
+class _Node:
+    """Skip list node; width[i] is the rank distance to forward[i]."""
+    __slots__ = ("key", "forward", "width")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.forward: List[Optional["_Node"]] = [None] * level
+        self.width: List[int] = [1] * level
+
+
+class RankedSkipList:
+    """Sorted collection of unique keys with positional access.
+
+    Every node records how many base-level steps each of its forward links
+    spans, so rank lookups and select-by-index run in expected O(log n)
+    alongside the usual insert and remove.
+    """
+
+    MAX_LEVEL = 32
+    BRANCH_PROBABILITY = 0.25
+
+    def __init__(self, seed: Optional[int] = None):
+        """Create an empty list. The seed only shapes tower heights."""
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        node = self._head.forward[0]
+        while node is not None:
+            yield node.key
+            node = node.forward[0]
+
+    def _random_level(self) -> int:
+        """Pick a tower height with geometric distribution."""
+        level = 1
+        while level < self.MAX_LEVEL and self._rng.random() < self.BRANCH_PROBABILITY:
+            level += 1
+        return level
+
+    def _find_predecessors(self, key) -> Tuple[List[_Node], List[int]]:
+        """Return the last node before key on each level and its rank."""
+        update = [self._head] * self.MAX_LEVEL
+        steps = [0] * self.MAX_LEVEL
+        node = self._head
+        pos = 0
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                pos += node.width[i]
+                node = node.forward[i]
+            update[i] = node
+            steps[i] = pos
+        return update, steps
+
+    def insert(self, key):
+        """Insert a key. Keys must be unique and mutually comparable."""
+        update, steps = self._find_predecessors(key)
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                update[i] = self._head
+                steps[i] = 0
+                self._head.width[i] = self._size + 1
+            self._level = level
+
+        new_pos = steps[0] + 1
+        node = _Node(key, level)
+        for i in range(level):
+            prev = update[i]
+            node.forward[i] = prev.forward[i]
+            node.width[i] = prev.width[i] + steps[i] + 1 - new_pos
+            prev.forward[i] = node
+            prev.width[i] = new_pos - steps[i]
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def remove(self, key):
+        """Remove a key, raising KeyError if it is not present."""
+        update, _ = self._find_predecessors(key)
+        target = update[0].forward[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for i in range(self._level):
+            prev = update[i]
+            if prev.forward[i] is target:
+                prev.width[i] += target.width[i] - 1
+                prev.forward[i] = target.forward[i]
+            else:
+                prev.width[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+
+    def rank(self, key) -> int:
+        """Return the 0-based position of a key, raising KeyError if absent."""
+        update, steps = self._find_predecessors(key)
+        target = update[0].forward[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        return steps[0]
+
+    def _node_at(self, index: int) -> Optional[_Node]:
+        """Return the node at a 0-based position, or None if out of range."""
+        if index < 0 or index >= self._size:
+            return None
+        target = index + 1
+        node = self._head
+        pos = 0
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and pos + node.width[i] <= target:
+                pos += node.width[i]
+                node = node.forward[i]
+        return node
+
+    def at(self, index: int):
+        """Return the key at a 0-based position."""
+        node = self._node_at(index)
+        if node is None:
+            raise IndexError(index)
+        return node.key
+
+    def range(self, start: int, stop: int) -> List:
+        """Return keys in positions [start, stop) in O(log n + k)."""
+        start = max(0, start)
+        node = self._node_at(start)
+        keys = []
+        while node is not None and start < stop:
+            keys.append(node.key)
+            node = node.forward[0]
+            start += 1
+        return keys
+
+
+# ============================================================================
+# LEADERBOARD
+# ============================================================================
+
+# Board name -> score tuple extracted from a player (higher ranks first)
+BOARDS: Dict[str, Callable[[Player], Tuple[int, ...]]] = {
+    "total_xp": lambda p: (p.total_xp_earned,),
+    "level": lambda p: (p.level, p.xp),
+    "streak": lambda p: (p.quest_streak,),
+}
+
+
+class Leaderboard:
+    """Incrementally maintained rankings across many players.
+
+    Each board keeps keys of the form ``(-score..., player_id)`` in a
+    RankedSkipList, so ascending order is the leaderboard order and ties
+    are broken by player id. A player's keys are replaced only when their
+    score changes, never by re-sorting the whole population.
+    """
+
+    def __init__(self):
+        """Create empty boards for every entry in BOARDS."""
+        self._boards = {name: RankedSkipList() for name in BOARDS}
+        self._keys: Dict[str, Dict[str, Tuple]] = {}
+        self._listeners: Dict[str, Tuple[GameEngine, Callable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    # ========================================================================
+    # FEEDING
+    # ========================================================================
+
+    def attach(self, engine: GameEngine, player_id: Optional[str] = None) -> str:
+        """Track an engine's player, updating ranks on every engine event."""
+        player_id = player_id or engine.game_state.player.name
+        if player_id in self._listeners:
+            raise ValueError(f"Player '{player_id}' is already attached")
+
+        def listener(event: GameEvent, source: GameEngine, payload: Dict):
+            self.update(player_id, source.game_state.player)
+
+        engine.subscribe(listener)
+        self._listeners[player_id] = (engine, listener)
+        self.update(player_id, engine.game_state.player)
+        return player_id
+
+    def detach(self, player_id: str):
+        """Stop tracking a player and drop them from every board."""
+        engine, listener = self._listeners.pop(player_id)
+        engine.unsubscribe(listener)
+        self.remove(player_id)
+
+    def update(self, player_id: str, player: Player):
+        """Insert or reposition a player on every board."""
+        keys = self._keys.setdefault(player_id, {})
+        for name, score_of in BOARDS.items():
+            new_key = tuple(-v for v in score_of(player)) + (player_id,)
+            old_key = keys.get(name)
+            if old_key == new_key:
+                continue
+            board = self._boards[name]
+            if old_key is not None:
+                board.remove(old_key)
+            board.insert(new_key)
+            keys[name] = new_key
+
+    def remove(self, player_id: str):
+        """Drop a player from every board."""
+        keys = self._keys.pop(player_id, None)
+        if keys is None:
+            return
+        for name, key in keys.items():
+            self._boards[name].remove(key)
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def _board(self, board: str) -> RankedSkipList:
+        """Look up a board by name."""
+        if board not in self._boards:
+            raise ValueError(f"Unknown board '{board}'. Choose from {sorted(self._boards)}")
+        return self._boards[board]
+
+    @staticmethod
+    def _entry(rank: int, key: Tuple) -> Dict:
+        """Format a board key as an output entry (1-based rank)."""
+        scores = [-v for v in key[:-1]]
+        return {
+            "rank": rank + 1,
+            "player_id": key[-1],
+            "score": scores[0] if len(scores) == 1 else scores
+        }
+
+    def top(self, board: str, k: int = 10) -> List[Dict]:
+        """Return the top-k entries of a board."""
+        keys = self._board(board).range(0, k)
+        return [self._entry(i, key) for i, key in enumerate(keys)]
+
+    def rank_of(self, board: str, player_id: str) -> Optional[int]:
+        """Return a player's 1-based rank, or None if not ranked."""
+        key = self._keys.get(player_id, {}).get(board)
+        if key is None:
+            return None
+        return self._board(board).rank(key) + 1
+
+    def around(self, board: str, player_id: str, radius: int = 5) -> List[Dict]:
+        """Return the entries within `radius` places of a player."""
+        key = self._keys.get(player_id, {}).get(board)
+        if key is None:
+            return []
+        ranked = self._board(board)
+        pos = ranked.rank(key)
+        start = max(0, pos - radius)
+        keys = ranked.range(start, pos + radius + 1)
+        return [self._entry(start + i, key) for i, key in enumerate(keys)]
+
+    def to_dict(self, k: int = 10) -> Dict:
+        """Convert the top of every board to a dictionary for JSON output."""
+        return {
+            "total_players": len(self._keys),
+            "boards": {name: self.top(name, k) for name in self._boards}
+        }
@@ -0,0 +1,364 @@
+"""
+Life RPG Load Generator
+Synthesize command traces, replay them against CLIInterfaces, report latency.
+
+Architecture:
+- TraceEvent / Trace: Timestamped per-player commands, saved as JSONL
+- synthesize(): Seeded trace with a configurable command mix, Zipf player
+  skew and bursty per-player sessions
+- CLIPool: One seeded CLIInterface per player, or a fixed pool players
+  hash into
+- replay(): Open-loop replay at the recorded timing, a target rate, or as
+  fast as possible, returning a ReplayReport
+
+Quest ids are not known when a trace is generated, so quest_complete and
+quest_miss carry the QUEST_PLACEHOLDER argument, resolved at replay time
+to the player's oldest open quest. Each engine is seeded from the pool
+seed and its player key, so replaying a trace with the same seed yields
+the same quests, XP and responses. The same trace file therefore drives
+both capacity planning and regression runs.
+
+Usage:
+    python3 life_rpg_loadgen.py generate --events 100000 --players 500 --out trace.jsonl
+    python3 life_rpg_loadgen.py replay trace.jsonl --rate 5000
+    python3 life_rpg_loadgen.py run --events 20000 --rate 0
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from life_rpg_game_master import CLIInterface
+
+
+TRACE_FORMAT = "life-rpg-trace"
+TRACE_VERSION = 1
+QUEST_PLACEHOLDER = "@open"
+
+# Share of each command in a synthesized trace
+DEFAULT_MIX = {
+    "status": 0.40,
+    "quests": 0.25,
+    "quest_complete": 0.20,
+    "quest_miss": 0.05,
+    "next_day": 0.10,
+}
+QUEST_COMMANDS = ("quest_complete", "quest_miss")
+
+# Commands inside a burst arrive this many times faster than sessions start
+BURST_SPEEDUP = 20
+
+PERCENTILES = (50, 99, 99.9)
+
+
+# ============================================================================
+# TRACES
+# ============================================================================
+
+@dataclass(frozen=True)
+class TraceEvent:
+    """One command sent by one player, `t` seconds into the trace."""
+    t: float
+    player: str
+    command: str
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output."""
+        return {"t": round(self.t, 6), "player": self.player, "command": self.command}
+
+
+@dataclass
+class Trace:
+    """An ordered list of events plus the parameters that produced them."""
+    events: List[TraceEvent]
+    params: Dict = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the first to the last event."""
+        return self.events[-1].t - self.events[0].t if self.events else 0.0
+
+    def save(self, path: str):
+        """Write a header line followed by one JSON event per line."""
+        with open(path, "w") as f:
+            header = {"format": TRACE_FORMAT, "version": TRACE_VERSION, "params": self.params}
+            f.write(json.dumps(header) + "\n")
+            for event in self.events:
+                f.write(json.dumps(event.to_dict()) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Trace":
+        """Read a trace written by save()."""
+        with open(path) as f:
+            header = json.loads(f.readline())
+            if header.get("format") != TRACE_FORMAT or header.get("version") != TRACE_VERSION:
+                raise ValueError(f"'{path}' is not a version {TRACE_VERSION} trace")
+            events = [TraceEvent(**json.loads(line)) for line in f if line.strip()]
+        return cls(events, header.get("params", {}))
+
+
+def synthesize(events: int = 10000, players: int = 100, skew: float = 1.1,
+               burstiness: float = 0.5, rate: float = 1000.0,
+               mix: Optional[Dict[str, float]] = None, seed: int = 0) -> Trace:
+    """Generate a reproducible trace.
+
+    Sessions start as a Poisson process; each picks a player with Zipf
+    weight 1/rank**skew (0 = uniform) and sends a geometric number of
+    commands (mean 1 / (1 - burstiness)) in quick succession. Timestamps
+    are then scaled so the whole trace averages `rate` commands/second.
+    """
+    if not 0 <= burstiness < 1:
+        raise ValueError("burstiness must be in [0, 1)")
+    if events < 1 or players < 1 or rate <= 0:
+        raise ValueError("events, players and rate must be positive")
+    mix = mix or DEFAULT_MIX
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"Unknown commands in mix: {sorted(unknown)}")
+
+    rng = random.Random(seed)
+    names = [f"player{i}" for i in range(players)]
+    player_weights = [1 / (rank ** skew) for rank in range(1, players + 1)]
+    commands = list(mix)
+    command_weights = [mix[c] for c in commands]
+
+    pending = []
+    session_start = 0.0
+    while len(pending) < events:
+        session_start += rng.expovariate(1.0)
+        player = rng.choices(names, player_weights)[0]
+        t = session_start
+        while True:
+            command = rng.choices(commands, command_weights)[0]
+            if command in QUEST_COMMANDS:
+                command = f"{command} {QUEST_PLACEHOLDER}"
+            pending.append((t, player, command))
+            if len(pending) >= events or rng.random() >= burstiness:
+                break
+            t += rng.expovariate(BURST_SPEEDUP)
+
+    # Stable sort keeps each player's burst in order when sessions overlap
+    pending.sort(key=lambda e: e[0])
+    scale = (events / rate) / pending[-1][0] if pending[-1][0] > 0 else 0.0
+    params = {"events": events, "players": players, "skew": skew,
+              "burstiness": burstiness, "rate": rate, "mix": mix, "seed": seed}
+    return Trace([TraceEvent(t * scale, p, c) for t, p, c in pending], params)
+
+
+# ============================================================================
+# REPLAY
+# ============================================================================
+
+class CLIPool:
+    """CLIInterfaces keyed by player, created (with their engine) on first use.
+
+    With `pool_size`, players hash onto that many shared interfaces to
+    bound memory for very large player counts. Every engine is seeded with
+    engine_seed(key), derived from `seed` and the interface's key.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, instrument: bool = False,
+                 seed: int = 0):
+        """Create an empty pool."""
+        self.pool_size = pool_size
+        self.instrument = instrument
+        self.seed = seed
+        self._clis: Dict[str, CLIInterface] = {}
+
+    def __len__(self) -> int:
+        return len(self._clis)
+
+    def cli_for(self, player: str) -> CLIInterface:
+        """Return the interface serving a player."""
+        key = player
+        if self.pool_size:
+            key = f"pool{zlib.crc32(player.encode()) % self.pool_size}"
+        cli = self._clis.get(key)
+        if cli is None:
+            cli = self._clis[key] = CLIInterface(key, instrument=self.instrument, indent=None,
+                                                 seed=self.engine_seed(key))
+            # Build the lazy engine now, so no player's first command is timed
+            # with construction included
+            cli.engine
+        return cli
+
+    def engine_seed(self, key: str) -> int:
+        """Seed for the engine behind one interface key."""
+        return (self.seed << 32) | zlib.crc32(key.encode())
+
+    @staticmethod
+    def resolve(cli: CLIInterface, command: str) -> str:
+        """Replace the quest placeholder with the player's oldest open quest."""
+        if QUEST_PLACEHOLDER not in command:
+            return command
+        quest_id = "none"
+        for quest in cli.engine.game_state.active_quests:
+            if not quest.completed and not quest.missed:
+                quest_id = quest.quest_id
+                break
+        return command.replace(QUEST_PLACEHOLDER, quest_id)
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, math.ceil(len(sorted_samples) * pct / 100) - 1))
+    return sorted_samples[index]
+
+
+@dataclass
+class ReplayReport:
+    """Throughput and latency of one replay (latencies in microseconds).
+
+    `service_us` times handle_command alone; `response_us` is measured from
+    each event's scheduled send time, so it includes time spent queued
+    behind slower commands (it does not suffer from coordinated omission).
+    """
+    events: int
+    errors: int
+    elapsed_s: float
+    target_rate: Optional[float]
+    seed: int  # CLIPool seed the engines were derived from
+    commands: Dict[str, int]
+    service_us: Dict[str, float]
+    response_us: Dict[str, float]
+
+    @property
+    def throughput(self) -> float:
+        """Commands completed per second."""
+        return self.events / self.elapsed_s if self.elapsed_s else 0.0
+
+    def to_dict(self):
+        """Convert to dictionary for JSON output."""
+        data = asdict(self)
+        data["throughput"] = round(self.throughput, 1)
+        return data
+
+
+def _summarize(samples_s: List[float]) -> Dict[str, float]:
+    """Percentiles and max of a list of durations, in microseconds."""
+    samples = sorted(samples_s)
+    summary = {f"p{pct:g}": round(percentile(samples, pct) * 1e6, 1) for pct in PERCENTILES}
+    summary["max"] = round(samples[-1] * 1e6, 1) if samples else 0.0
+    return summary
+
+
+def replay(trace: Trace, pool: Optional[CLIPool] = None,
+           rate: Optional[float] = None) -> ReplayReport:
+    """Replay a trace open-loop against a CLIPool.
+
+    `rate` None keeps the trace's own timing, 0 sends as fast as possible,
+    and any other value spaces events evenly at that many per second.
+    """
+    if pool is None:
+        pool = CLIPool()
+    events = trace.events
+    if rate is None:
+        origin = events[0].t if events else 0.0
+        schedule = [e.t - origin for e in events]
+    elif rate == 0:
+        schedule = None
+    else:
+        schedule = [i / rate for i in range(len(events))]
+
+    service, response = [], []
+    commands: Dict[str, int] = {}
+    errors = 0
+    clock = time.perf_counter
+    started = clock()
+    for i, event in enumerate(events):
+        cli = pool.cli_for(event.player)
+        command = pool.resolve(cli, event.command)
+        if schedule is not None:
+            due = started + schedule[i]
+            delay = due - clock()
+            if delay > 0:
+                time.sleep(delay)
+        sent = clock()
+        reply = cli.handle_command(command)
+        done = clock()
+        service.append(done - sent)
+        response.append(done - (due if schedule is not None else sent))
+        name = command.split(" ", 1)[0]
+        commands[name] = commands.get(name, 0) + 1
+        if '"error"' in reply:
+            errors += 1
+    elapsed = clock() - started
+
+    return ReplayReport(
+        events=len(events),
+        errors=errors,
+        elapsed_s=round(elapsed, 6),
+        target_rate=rate,
+        seed=pool.seed,
+        commands=commands,
+        service_us=_summarize(service),
+        response_us=_summarize(response),
+    )
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv=None):
+    """Entry point: generate, replay, or generate-and-replay a trace."""
+    parser = argparse.ArgumentParser(description="Life RPG load generator")
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    def add_synth_args(p):
+        p.add_argument("--events", type=int, default=10000, help="Commands in the trace")
+        p.add_argument("--players", type=int, default=100, help="Distinct players")
+        p.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for player popularity")
+        p.add_argument("--burstiness", type=float, default=0.5,
+                       help="Chance a session sends another command, in [0, 1)")
+        p.add_argument("--trace-rate", type=float, default=1000.0,
+                       help="Average commands/second recorded in the trace")
+        p.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    def add_replay_args(p):
+        p.add_argument("--rate", type=float, default=None,
+                       help="Replay rate in commands/second (0 = unthrottled; default: trace timing)")
+        p.add_argument("--pool-size", type=int, default=None,
+                       help="Share this many interfaces across all players")
+        p.add_argument("--engine-seed", type=int, default=0,
+                       help="Seed the players' engines are derived from")
+
+    generate = sub.add_parser("generate", help="Write a synthesized trace")
+    add_synth_args(generate)
+    generate.add_argument("--out", required=True, help="Output JSONL path")
+
+    replay_cmd = sub.add_parser("replay", help="Replay a saved trace")
+    replay_cmd.add_argument("trace", help="Trace JSONL path")
+    add_replay_args(replay_cmd)
+
+    run = sub.add_parser("run", help="Synthesize and replay without saving")
+    add_synth_args(run)
+    add_replay_args(run)
+
+    args = parser.parse_args(argv)
+    if args.action == "replay":
+        trace = Trace.load(args.trace)
+    else:
+        trace = synthesize(args.events, args.players, args.skew, args.burstiness,
+                           args.trace_rate, seed=args.seed)
+    if args.action == "generate":
+        trace.save(args.out)
+        print(json.dumps({"success": True, "events": len(trace.events),
+                          "duration_s": round(trace.duration, 3), "path": args.out}, indent=2))
+        return 0
+
+    report = replay(trace, CLIPool(args.pool_size, seed=args.engine_seed), rate=args.rate)
+    print(json.dumps(report.to_dict(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Life RPG Persistent Containers
+Structurally shared list used for copy-on-write GameState snapshots.
+
+PersistentList is a 32-way trie with a tail buffer (the layout used by
+Clojure's vectors). Nodes carry an owner token: the list mutates nodes it
+owns in place and path-copies the ones it does not. fork() hands out a
+second list over the same nodes and revokes ownership on both sides, so
+a snapshot is O(1) and each later write copies at most one root-to-leaf
+path (O(log32 n) nodes).
+"""
+
+from typing import Any, Iterable, Iterator, List
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+
+
+class _Node:
+    """Trie node; `owner` is the token of the list allowed to mutate it."""
+    __slots__ = ("owner", "array")
+
+    def __init__(self, owner: object, array: List[Any]):
+        self.owner = owner
+        self.array = array
+
+
+class PersistentList:
+    """List-like sequence with O(1) fork() and path-copying writes.
+
+    Supports len, indexing (including negative indices and slices, which
+    return plain lists), iteration, append and item assignment.
+    """
+    __slots__ = ("_count", "_shift", "_root", "_tail", "_owner")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        """Create a list holding `items`."""
+        self._owner = object()
+        self._count = 0
+        self._shift = BITS
+        self._root = _Node(self._owner, [])
+        self._tail = _Node(self._owner, [])
+        for item in items:
+            self.append(item)
+
+    def fork(self) -> "PersistentList":
+        """Return an independent list sharing all nodes with this one."""
+        other = PersistentList.__new__(PersistentList)
+        other._count = self._count
+        other._shift = self._shift
+        other._root = self._root
+        other._tail = self._tail
+        other._owner = object()
+        # Neither side may now write shared nodes in place
+        self._owner = object()
+        return other
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _tail_offset(self) -> int:
+        """Index of the first element held in the tail."""
+        if self._count < WIDTH:
+            return 0
+        return ((self._count - 1) >> BITS) << BITS
+
+    def _leaf(self, index: int) -> List[Any]:
+        """Return the array holding `index`."""
+        if index >= self._tail_offset():
+            return self._tail.array
+        node = self._root
+        for level in range(self._shift, 0, -BITS):
+            node = node.array[(index >> level) & MASK]
+        return node.array
+
+    def _normalize(self, index: int) -> int:
+        """Resolve a possibly negative index, raising IndexError if out of range."""
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("PersistentList index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        index = self._normalize(index)
+        return self._leaf(index)[index & MASK]
+
+    def __iter__(self) -> Iterator[Any]:
+        tail_offset = self._tail_offset()
+        for start in range(0, tail_offset, WIDTH):
+            yield from self._leaf(start)
+        yield from self._tail.array
+
+    def __repr__(self) -> str:
+        return f"PersistentList({list(self)!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PersistentList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def _owned(self, node: _Node) -> _Node:
+        """Return `node` if this list owns it, else an owned copy."""
+        if node.owner is self._owner:
+            return node
+        return _Node(self._owner, list(node.array))
+
+    def append(self, item: Any):
+        """Add an item at the end."""
+        self._tail = self._owned(self._tail)
+        if len(self._tail.array) < WIDTH:
+            self._tail.array.append(item)
+            self._count += 1
+            return
+
+        # Tail is full: push it into the trie and start a new one
+        full_tail = self._tail
+        if (self._count >> BITS) > (1 << self._shift):
+            root = _Node(self._owner, [self._root, self._new_path(self._shift, full_tail)])
+            self._shift += BITS
+        else:
+            root = self._push_tail(self._shift, self._root, full_tail)
+        self._root = root
+        self._tail = _Node(self._owner, [item])
+        self._count += 1
+
+    def _new_path(self, level: int, node: _Node) -> _Node:
+        """Wrap a leaf in single-child branches up to `level`."""
+        while level > 0:
+            node = _Node(self._owner, [node])
+            level -= BITS
+        return node
+
+    def _push_tail(self, level: int, parent: _Node, tail: _Node) -> _Node:
+        """Insert a full tail as the next leaf below `parent`."""
+        parent = self._owned(parent)
+        sub_index = ((self._count - 1) >> level) & MASK
+        if level == BITS:
+            child = tail
+        elif sub_index < len(parent.array):
+            child = self._push_tail(level - BITS, parent.array[sub_index], tail)
+        else:
+            child = self._new_path(level - BITS, tail)
+        if sub_index < len(parent.array):
+            parent.array[sub_index] = child
+        else:
+            parent.array.append(child)
+        return parent
+
+    def __setitem__(self, index: int, item: Any):
+        index = self._normalize(index)
+        if index >= self._tail_offset():
+            self._tail = self._owned(self._tail)
+            self._tail.array[index & MASK] = item
+            return
+        self._root = self._assoc(self._shift, self._root, index, item)
+
+    def _assoc(self, level: int, node: _Node, index: int, item: Any) -> _Node:
+        """Set an element, copying unowned nodes along the path."""
+        node = self._owned(node)
+        if level == 0:
+            node.array[index & MASK] = item
+        else:
+            sub_index = (index >> level) & MASK
+            node.array[sub_index] = self._assoc(level - BITS, node.array[sub_index], index, item)
+        return node
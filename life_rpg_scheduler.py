@@ -0,0 +1,308 @@
+"""
+Life RPG Scheduler
+Hierarchical timing wheel for quest deadlines and buff expiries.
+
+Architecture:
+- TimerHandle: A scheduled callback, cancellable in O(1)
+- HierarchicalTimingWheel: Multi-level wheel; each tick touches only the
+  timers that are due (plus occasional cascades of coarser slots)
+- ExpiryScheduler: Owns the game day for many GameEngines; one wheel tick
+  is one day and rolls every attached engine over
+"""
+
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
+
+from life_rpg_game_master import Buff, GameEngine, Quest, QuestType
+
+
+# Deadlines, in days after creation
+DAILY_QUEST_DEADLINE_DAYS = 1
+WEEKLY_BOSS_DEADLINE_DAYS = 7
+
+
+# ============================================================================
+# TIMING WHEEL
+# ============================================================================
+
+class TimerHandle:
+    """A scheduled callback; pass it to cancel() to unschedule."""
+    __slots__ = ("due", "callback", "args", "_bucket")
+
+    def __init__(self, due: int, callback: Callable, args: tuple):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self._bucket: Optional[Dict["TimerHandle", None]] = None
+
+    @property
+    def active(self) -> bool:
+        """True while the timer is scheduled and has not fired."""
+        return self._bucket is not None
+
+
+class HierarchicalTimingWheel:
+    """Timers bucketed by due tick across levels of increasing granularity.
+
+    Level i has `slots` buckets each spanning slots**i ticks. A timer is
+    placed on the finest level whose range covers it and migrates down
+    (cascades) as its due tick approaches. Scheduling and cancelling are
+    O(1); advancing one tick costs O(timers due) plus amortized cascades.
+    Timers further out than the top level wait in an overflow list.
+    Buckets are insertion-ordered dicts, so timers due on the same tick
+    fire in a reproducible order.
+    """
+
+    def __init__(self, slots: int = 64, levels: int = 4, start_tick: int = 0):
+        """Create an empty wheel positioned at `start_tick`."""
+        self.slots = slots
+        self.levels = levels
+        self.now = start_tick
+        self._spans = [slots ** i for i in range(levels + 1)]
+        self._wheels: List[List[Dict[TimerHandle, None]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow: Dict[TimerHandle, None] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _place(self, handle: TimerHandle):
+        """Put a handle in the bucket matching its distance from now."""
+        delta = handle.due - self.now
+        for level in range(self.levels):
+            if delta < self._spans[level + 1]:
+                index = (handle.due // self._spans[level]) % self.slots
+                bucket = self._wheels[level][index]
+                break
+        else:
+            bucket = self._overflow
+        bucket[handle] = None
+        handle._bucket = bucket
+
+    def schedule_at(self, due: int, callback: Callable, *args) -> TimerHandle:
+        """Call callback(*args) when the wheel reaches tick `due`.
+
+        Raises ValueError for ticks at or before the current one; a past
+        deadline is never silently moved into the future.
+        """
+        if due <= self.now:
+            raise ValueError(f"Tick {due} is not after the current tick {self.now}")
+        handle = TimerHandle(due, callback, args)
+        self._place(handle)
+        self._count += 1
+        return handle
+
+    def schedule_in(self, delay: int, callback: Callable, *args) -> TimerHandle:
+        """Call callback(*args) `delay` ticks from now."""
+        return self.schedule_at(self.now + delay, callback, *args)
+
+    def cancel(self, handle: TimerHandle) -> bool:
+        """Unschedule a timer; return False if it already fired or was cancelled."""
+        if handle._bucket is None:
+            return False
+        del handle._bucket[handle]
+        handle._bucket = None
+        self._count -= 1
+        return True
+
+    def _cascade(self, level: int):
+        """Move the current slot of a coarse level down to finer levels."""
+        index = (self.now // self._spans[level]) % self.slots
+        bucket = self._wheels[level][index]
+        if not bucket:
+            return
+        self._wheels[level][index] = {}
+        for handle in bucket:
+            self._place(handle)
+
+    def _tick(self) -> int:
+        """Advance one tick and fire the timers due on it."""
+        self.now += 1
+        if self._overflow and self.now % self._spans[self.levels - 1] == 0:
+            pending = self._overflow
+            self._overflow = {}
+            for handle in pending:
+                self._place(handle)
+        for level in range(self.levels - 1, 0, -1):
+            if self.now % self._spans[level] == 0:
+                self._cascade(level)
+
+        index = self.now % self.slots
+        due = self._wheels[0][index]
+        if not due:
+            return 0
+        self._wheels[0][index] = {}
+        for handle in due:
+            handle._bucket = None
+        self._count -= len(due)
+        for handle in due:
+            handle.callback(*handle.args)
+        return len(due)
+
+    def advance_to(self, tick: int) -> int:
+        """Advance to `tick`, firing everything due on the way.
+
+        Returns the number of timers fired. An empty wheel jumps directly.
+        """
+        fired = 0
+        while self.now < tick:
+            if self._count == 0:
+                self.now = tick
+                break
+            fired += self._tick()
+        return fired
+
+
+# ============================================================================
+# ENGINE INTEGRATION
+# ============================================================================
+
+class ExpiryScheduler:
+    """One timing wheel driving quest deadlines and buff expiries for many engines.
+
+    The scheduler owns the game day: one wheel tick is one day, and each
+    tick first fires the timers due that day and then rolls every attached
+    engine over to it. Calling next_day() on an attached engine advances
+    the shared day, so all players always stay on the same day.
+
+    Attached engines skip their per-day quest scan and buff countdown.
+    Daily and random quests are auto-missed when the day after their
+    creation begins, weekly boss quests a week after creation, and buffs
+    are removed when their duration runs out. Deadlines that have already
+    passed when registered expire immediately.
+
+    In this mode Buff.duration_days keeps its initial value; the wheel
+    holds the actual end day, which is mirrored in Buff.expires_day so
+    responses report the remaining duration.
+    """
+
+    def __init__(self, start_day: int = 1, wheel: Optional[HierarchicalTimingWheel] = None):
+        """Create a scheduler whose wheel starts at `start_day`."""
+        self.wheel = wheel or HierarchicalTimingWheel(start_tick=start_day)
+        # Attached engines in attach order (held, so their ids stay unique)
+        self._engines: Dict[int, GameEngine] = {}
+        # id(engine) -> {quest_id: handle}
+        self._quest_timers: Dict[int, Dict[str, TimerHandle]] = {}
+        # id(engine) -> {id(buff): handle}
+        self._buff_timers: Dict[int, Dict[int, TimerHandle]] = {}
+        # Buffs whose timer fired this tick, removed after the quest deadlines
+        self._expiring: List[tuple] = []
+
+    @property
+    def day(self) -> int:
+        """The current global day."""
+        return self.wheel.now
+
+    def __len__(self) -> int:
+        """Number of attached engines."""
+        return len(self._engines)
+
+    def attach(self, engine: GameEngine):
+        """Hand an engine's day and expiry over to this scheduler.
+
+        The engine must be on the scheduler's current day and must not be
+        in calendar mode (where the clock owns the day).
+        """
+        if engine.scheduler is not None:
+            raise ValueError("Engine is already attached to a scheduler")
+        if engine.start_date is not None:
+            raise ValueError("Calendar-mode engines cannot be attached to a scheduler")
+        day = engine.game_state.player.current_day
+        if day != self.day:
+            raise ValueError(f"Engine is on day {day} but the scheduler is on day {self.day}")
+        engine.scheduler = self
+        self._engines[id(engine)] = engine
+        self._quest_timers[id(engine)] = {}
+        self._buff_timers[id(engine)] = {}
+        for quest in list(engine.game_state.active_quests):
+            if not quest.completed and not quest.missed:
+                self.schedule_quest(engine, quest)
+        for buff in list(engine.game_state.player.active_buffs):
+            self.schedule_buff(engine, buff)
+
+    def detach(self, engine: GameEngine):
+        """Cancel an engine's timers and give its day and expiry back to it."""
+        for handle in self._quest_timers.pop(id(engine), {}).values():
+            self.wheel.cancel(handle)
+        for handle in self._buff_timers.pop(id(engine), {}).values():
+            self.wheel.cancel(handle)
+        self._engines.pop(id(engine), None)
+        engine.scheduler = None
+        # The engine counts buff durations down itself again
+        player = engine.game_state.player
+        player.active_buffs = [
+            replace(b, duration_days=b.expires_day - player.current_day, expires_day=None)
+            if b.expires_day is not None else b
+            for b in player.active_buffs
+        ]
+
+    def schedule_quest(self, engine: GameEngine, quest: Quest):
+        """Register a quest's deadline, expiring it now if already passed."""
+        if quest.quest_type == QuestType.WEEKLY_BOSS:
+            due = quest.created_day + WEEKLY_BOSS_DEADLINE_DAYS
+        else:
+            due = quest.created_day + DAILY_QUEST_DEADLINE_DAYS
+        if due <= self.day:
+            engine.expire_quest(quest.quest_id)
+            return
+        timers = self._quest_timers[id(engine)]
+        timers[quest.quest_id] = self.wheel.schedule_at(
+            due, self._expire_quest, engine, quest.quest_id
+        )
+
+    def cancel_quest(self, engine: GameEngine, quest_id: str):
+        """Drop a quest's deadline once it is completed or missed."""
+        handle = self._quest_timers.get(id(engine), {}).pop(quest_id, None)
+        if handle is not None:
+            self.wheel.cancel(handle)
+
+    def schedule_buff(self, engine: GameEngine, buff: Buff):
+        """Register a buff's end day, expiring it now if already passed.
+
+        The end day counts from the engine's day, which during a tick is
+        still the day being closed (the wheel is already on the next), so
+        a buff lasts as long as it would without a scheduler.
+        """
+        due = engine.game_state.player.current_day + buff.duration_days
+        buff.expires_day = due
+        if due <= self.day:
+            engine.expire_buff(buff)
+            return
+        self._buff_timers[id(engine)][id(buff)] = self.wheel.schedule_at(
+            due, self._expire_buff, engine, buff
+        )
+
+    def _expire_quest(self, engine: GameEngine, quest_id: str):
+        """Wheel callback: a quest deadline passed."""
+        self._quest_timers[id(engine)].pop(quest_id, None)
+        engine.expire_quest(quest_id)
+
+    def _expire_buff(self, engine: GameEngine, buff: Buff):
+        """Wheel callback: a buff ran out (removed once the tick's quests expire)."""
+        self._buff_timers[id(engine)].pop(id(buff), None)
+        self._expiring.append((engine, buff))
+
+    def next_day(self) -> int:
+        """Advance the shared day by one; returns the number of timers fired."""
+        return self.advance_to(self.day + 1)
+
+    def advance_to(self, day: int) -> int:
+        """Move the global day forward one tick at a time.
+
+        Each tick fires the timers due that day, then rolls every attached
+        engine over to it. As in an engine's own rollover, quests are
+        auto-missed before buffs run out, so a fatigue ending that day is
+        still active when those misses are counted. Returns the number of
+        timers fired.
+        """
+        fired = 0
+        while self.day < day:
+            fired += self.wheel.advance_to(self.day + 1)
+            expiring, self._expiring = self._expiring, []
+            for engine, buff in expiring:
+                engine.expire_buff(buff)
+            for engine in list(self._engines.values()):
+                engine.scheduled_rollover()
+        return fired
@@ -0,0 +1,401 @@
+"""
+Life RPG Time Series
+Per-player, per-day history of XP, level and stats in memory-mapped files.
+
+Architecture:
+- SeriesFile: One player's history, column-major int32 arrays in one file
+- TimeSeriesStore: Directory of SeriesFiles plus an append-only player index
+- TimeSeriesRecorder: GameEngine listener appending one row per player-day
+
+File layout (native byte order):
+    header  = magic b"LRTS", format version, capacity, row count (4 x uint32)
+    columns = len(COLUMNS) blocks of `capacity` int32 values, one per column
+
+Column-major storage means a day range of one column is a contiguous slice
+of the map, returned as a memoryview without copying. Views are only
+valid until the file grows (capacity doubles when full) or is closed.
+
+Each player gets their own file rather than a region of one shared file,
+so a player's columns can grow independently without relocating anyone
+else's. The player index is a JSONL file with one line appended per new
+player, so registering a player is O(1) regardless of how many exist.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from life_rpg_game_master import GameEngine, GameEvent, Player
+
+
+COLUMNS = (
+    "day", "total_xp", "level",
+    "health", "energy", "focus", "discipline", "productivity", "consistency",
+    "completions", "misses",
+)
+COLUMN_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+
+MAGIC = b"LRTS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("=4sIII")
+VALUE = struct.Struct("=i")
+INITIAL_CAPACITY = 64
+INDEX_FILE = "index.jsonl"
+
+AGGREGATES = ("mean", "min", "max", "last", "sum")
+
+
+# ============================================================================
+# SERIES FILE
+# ============================================================================
+
+class SeriesFile:
+    """One player's history as a memory-mapped column-major file."""
+
+    def __init__(self, path: str, create: bool = False):
+        """Open (or create) a series file."""
+        self.path = path
+        if create and not os.path.exists(path):
+            self._write_empty(path, INITIAL_CAPACITY)
+        self._open()
+
+    @staticmethod
+    def _write_empty(path: str, capacity: int):
+        """Write a zero-filled file with the given capacity."""
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, capacity, 0))
+            f.truncate(HEADER.size + len(COLUMNS) * capacity * VALUE.size)
+
+    def _open(self):
+        """Map the file and read its header."""
+        with open(self.path, "r+b") as f:
+            self._map = mmap.mmap(f.fileno(), 0)
+        magic, version, self.capacity, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"'{self.path}' is not a version {FORMAT_VERSION} series file")
+
+    def _offset(self, column: int, row: int = 0) -> int:
+        """Byte offset of a cell."""
+        return HEADER.size + (column * self.capacity + row) * VALUE.size
+
+    def _release(self):
+        """Close the map unless callers still hold views into it."""
+        try:
+            self._map.close()
+        except BufferError:
+            # Outstanding memoryviews keep the old map alive until dropped
+            pass
+
+    def _grow(self):
+        """Double the capacity, copying each column block."""
+        new_capacity = self.capacity * 2
+        tmp_path = self.path + ".grow"
+        self._write_empty(tmp_path, new_capacity)
+        with open(tmp_path, "r+b") as f:
+            new_map = mmap.mmap(f.fileno(), 0)
+        size = self.count * VALUE.size
+        for column in range(len(COLUMNS)):
+            src = self._offset(column)
+            dst = HEADER.size + column * new_capacity * VALUE.size
+            new_map[dst:dst + size] = self._map[src:src + size]
+        HEADER.pack_into(new_map, 0, MAGIC, FORMAT_VERSION, new_capacity, self.count)
+        new_map.flush()
+        new_map.close()
+        self._release()
+        os.replace(tmp_path, self.path)
+        self._open()
+
+    def append(self, row: Sequence[int]):
+        """Append one row (values in COLUMNS order)."""
+        if len(row) != len(COLUMNS):
+            raise ValueError(f"Expected {len(COLUMNS)} values, got {len(row)}")
+        if self.count:
+            last_day = VALUE.unpack_from(self._map, self._offset(0, self.count - 1))[0]
+            if row[0] <= last_day:
+                raise ValueError(f"Day {row[0]} is not after the last recorded day {last_day}")
+        if self.count == self.capacity:
+            self._grow()
+        for column, value in enumerate(row):
+            VALUE.pack_into(self._map, self._offset(column, self.count), value)
+        self.count += 1
+        HEADER.pack_into(self._map, 0, MAGIC, FORMAT_VERSION, self.capacity, self.count)
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> memoryview:
+        """Zero-copy view of rows [start, stop) of one column."""
+        stop = self.count if stop is None else min(stop, self.count)
+        start = max(0, min(start, stop))
+        offset = self._offset(COLUMN_INDEX[name], start)
+        return memoryview(self._map)[offset:offset + (stop - start) * VALUE.size].cast("i")
+
+    def truncate(self, count: int):
+        """Drop every row from index `count` on."""
+        self.count = max(0, min(count, self.count))
+        HEADER.pack_into(self._map, 0, MAGIC, FORMAT_VERSION, self.capacity, self.count)
+
+    def row_range(self, start_day: Optional[int], end_day: Optional[int]) -> Tuple[int, int]:
+        """Row indices [start, stop) covering days start_day..end_day inclusive."""
+        days = self.column("day")
+        start = 0 if start_day is None else bisect_left(days, start_day)
+        stop = self.count if end_day is None else bisect_right(days, end_day)
+        days.release()
+        return start, stop
+
+    def flush(self):
+        """Write dirty pages to disk."""
+        self._map.flush()
+
+    def close(self):
+        """Unmap the file."""
+        self._release()
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class TimeSeriesStore:
+    """Directory of per-player series files with a player index."""
+
+    def __init__(self, root: str):
+        """Open (or create) a store rooted at a directory."""
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._index_path = os.path.join(root, INDEX_FILE)
+        self._index: Dict[str, str] = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted append
+                        continue
+                    self._index[entry["player"]] = entry["file"]
+        self._files: Dict[str, SeriesFile] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def players(self) -> List[str]:
+        """Return every player with recorded history."""
+        return sorted(self._index)
+
+    def _file(self, player_id: str, create: bool = False) -> Optional[SeriesFile]:
+        """Return the open series file for a player."""
+        series = self._files.get(player_id)
+        if series is not None:
+            return series
+        filename = self._index.get(player_id)
+        if filename is None:
+            if not create:
+                return None
+            safe = re.sub(r"[^A-Za-z0-9_-]", "_", player_id)[:40]
+            digest = hashlib.sha1(player_id.encode()).hexdigest()[:8]
+            filename = self._index[player_id] = f"{safe}-{digest}.lrts"
+            with open(self._index_path, "a") as f:
+                f.write(json.dumps({"player": player_id, "file": filename}) + "\n")
+        series = self._files[player_id] = SeriesFile(os.path.join(self.root, filename), create=True)
+        return series
+
+    def append(self, player_id: str, row: Sequence[int]):
+        """Append one day's row for a player (days must increase)."""
+        self._file(player_id, create=True).append(row)
+
+    def truncate(self, player_id: str, from_day: int) -> Optional[Tuple[int, ...]]:
+        """Drop a player's rows for `from_day` onward.
+
+        Returns the first dropped row (None if nothing was dropped).
+        """
+        series = self._file(player_id)
+        if series is None:
+            return None
+        start, _ = series.row_range(from_day, None)
+        if start >= series.count:
+            return None
+        row = tuple(VALUE.unpack_from(series._map, series._offset(column, start))[0]
+                    for column in range(len(COLUMNS)))
+        series.truncate(start)
+        return row
+
+    def last_day(self, player_id: str) -> Optional[int]:
+        """Newest recorded day for a player (None without history)."""
+        series = self._file(player_id)
+        if series is None or not series.count:
+            return None
+        return VALUE.unpack_from(series._map, series._offset(0, series.count - 1))[0]
+
+    def count(self, player_id: str) -> int:
+        """Number of recorded days for a player."""
+        series = self._file(player_id)
+        return series.count if series else 0
+
+    def read_range(self, player_id: str, start_day: Optional[int] = None,
+                   end_day: Optional[int] = None,
+                   columns: Optional[Iterable[str]] = None) -> Dict[str, memoryview]:
+        """Zero-copy views of columns for days start_day..end_day inclusive."""
+        columns = list(columns or COLUMNS)
+        for name in columns:
+            if name not in COLUMN_INDEX:
+                raise ValueError(f"Unknown column '{name}'. Choose from {list(COLUMNS)}")
+        series = self._file(player_id)
+        if series is None:
+            return {name: memoryview(b"").cast("i") for name in columns}
+        start, stop = series.row_range(start_day, end_day)
+        return {name: series.column(name, start, stop) for name in columns}
+
+    def downsample(self, player_id: str, column: str, bucket_days: int,
+                   agg: str = "mean", start_day: Optional[int] = None,
+                   end_day: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Aggregate a column into buckets of `bucket_days` days.
+
+        Returns (first day of bucket, value) pairs; buckets are aligned to
+        day 1 so weekly buckets start on days 1, 8, 15, ...
+        """
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{agg}'. Choose from {list(AGGREGATES)}")
+        views = self.read_range(player_id, start_day, end_day, ["day", column])
+        days, values = views["day"], views[column]
+        points: List[Tuple[int, float]] = []
+        bucket_start = None
+        acc = count = 0
+        for day, value in zip(days, values):
+            start = day - (day - 1) % bucket_days
+            if start != bucket_start:
+                if bucket_start is not None:
+                    points.append((bucket_start, acc / count if agg == "mean" else acc))
+                bucket_start, acc, count = start, value, 0
+            elif agg in ("mean", "sum"):
+                acc += value
+            elif agg == "min":
+                acc = min(acc, value)
+            elif agg == "max":
+                acc = max(acc, value)
+            else:
+                acc = value
+            count += 1
+        if bucket_start is not None:
+            points.append((bucket_start, acc / count if agg == "mean" else acc))
+        days.release()
+        values.release()
+        return points
+
+    def flush(self):
+        """Write all dirty pages to disk."""
+        for series in self._files.values():
+            series.flush()
+
+    def close(self):
+        """Unmap every open file."""
+        for series in self._files.values():
+            series.close()
+        self._files.clear()
+
+
+# ============================================================================
+# ENGINE RECORDER
+# ============================================================================
+
+class TimeSeriesRecorder:
+    """Append one row per player-day to a TimeSeriesStore from engine events.
+
+    The recorder runs inside the engine's rollover, so it never raises
+    there: a day that is not after the player's last recorded day is
+    skipped and counted in `rows_skipped` instead.
+    """
+
+    def __init__(self, store: TimeSeriesStore):
+        """Record into `store`."""
+        self.store = store
+        self.rows_skipped = 0
+        # player_id -> [completions today, misses today]
+        self._days: Dict[str, list] = {}
+        self._listeners: Dict[str, tuple] = {}
+
+    def attach(self, engine: GameEngine, player_id: Optional[str] = None) -> str:
+        """Start recording an engine's player.
+
+        Raises ValueError if the store already holds this player's history
+        for the engine's current day or later (e.g. a fresh engine attached
+        to a reopened store), since those days could not be recorded.
+        """
+        player_id = player_id or engine.game_state.player.name
+        if player_id in self._listeners:
+            raise ValueError(f"Player '{player_id}' is already attached")
+        day = engine.game_state.player.current_day
+        last_day = self.store.last_day(player_id)
+        if last_day is not None and day <= last_day:
+            raise ValueError(f"Player '{player_id}' has history up to day {last_day} but the "
+                             f"engine is on day {day}; attach it under another player id")
+
+        def listener(event: GameEvent, source: GameEngine, payload: Dict):
+            self.on_event(event, source, payload, player_id)
+
+        self._days[player_id] = [0, 0]
+        engine.subscribe(listener)
+        self._listeners[player_id] = (engine, listener)
+        return player_id
+
+    def detach(self, player_id: str):
+        """Stop recording a player."""
+        engine, listener = self._listeners.pop(player_id)
+        engine.unsubscribe(listener)
+        self._days.pop(player_id, None)
+
+    @staticmethod
+    def row_for(player: Player, day: int, completions: int, misses: int) -> Tuple[int, ...]:
+        """Build a row in COLUMNS order."""
+        stats = player.stats
+        return (
+            day, player.total_xp_earned, player.level,
+            stats.health, stats.energy, stats.focus,
+            stats.discipline, stats.productivity, stats.consistency,
+            completions, misses,
+        )
+
+    def on_event(self, event: GameEvent, engine: GameEngine, payload: Dict,
+                 player_id: Optional[str] = None):
+        """Engine listener: count the day's quests and close it out on rollover."""
+        player_id = player_id or engine.game_state.player.name
+        state = self._days.get(player_id)
+        if state is None:
+            return
+        if event == GameEvent.QUEST_COMPLETED:
+            state[0] += 1
+        elif event == GameEvent.QUEST_MISSED:
+            state[1] += 1
+        elif event == GameEvent.DAY_ADVANCED:
+            # The payload day is the new day; record the one that just ended
+            day = payload["day"] - 1
+            last_day = self.store.last_day(player_id)
+            if last_day is not None and day <= last_day:
+                self.rows_skipped += 1
+            else:
+                row = self.row_for(engine.game_state.player, day, state[0], state[1])
+                self.store.append(player_id, row)
+            state[0] = state[1] = 0
+        elif event == GameEvent.STATE_RESTORED:
+            self._reverse(player_id, state, payload["undone_events"])
+
+    def _reverse(self, player_id: str, state: list, undone_events: List):
+        """Take back the effects of undone events, newest first."""
+        completions = COLUMN_INDEX["completions"]
+        misses = COLUMN_INDEX["misses"]
+        for event, payload, _ in reversed(undone_events):
+            if event == GameEvent.QUEST_COMPLETED:
+                state[0] -= 1
+            elif event == GameEvent.QUEST_MISSED:
+                state[1] -= 1
+            elif event == GameEvent.DAY_ADVANCED:
+                # Reopen the closed day: drop its row, resume its counters
+                row = self.store.truncate(player_id, payload["day"] - 1)
+                if row is not None:
+                    state[0], state[1] = row[completions], row[misses]
@@ -0,0 +1,87 @@
+"""
+Life RPG Prefork Worker
+Long-lived parent that keeps a warmed CLIInterface and forks it per request.
+
+A process-per-request integration pays for interpreter startup, module
+import and engine construction on every call. The worker does that work
+once; each request then runs in a forked child that inherits the ready
+engine, so every request still starts from the same fresh state and
+cannot leak changes into the next one.
+
+Protocol (serve): one command per input line, one single-line JSON
+response per output line.
+
+Usage:
+    python3 life_rpg_worker.py --player Hero
+"""
+
+import argparse
+import os
+import sys
+from typing import Optional, TextIO
+
+from life_rpg_game_master import CLIInterface
+
+
+class PreforkWorker:
+    """Fork a prewarmed CLIInterface for each command (POSIX only)."""
+
+    def __init__(self, player_name: str = "Hero", instrument: bool = False):
+        """Import everything and build the template engine up front."""
+        if not hasattr(os, "fork"):
+            raise RuntimeError("PreforkWorker requires os.fork (POSIX only)")
+        self.template = CLIInterface(player_name, instrument=instrument, indent=None)
+        # Warm the lazy engine and the deferred json/datetime imports
+        self.template.handle_command("status")
+        self.requests_served = 0
+
+    def handle(self, command: str) -> str:
+        """Run one command in a forked child and return its JSON response."""
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                os.close(read_fd)
+                response = self.template.handle_command(command).encode()
+                with os.fdopen(write_fd, "wb") as pipe:
+                    pipe.write(response)
+            except BaseException:
+                status = 1
+            finally:
+                os._exit(status)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as pipe:
+            data = pipe.read()
+        _, status = os.waitpid(pid, 0)
+        self.requests_served += 1
+        if status != 0 and not data:
+            return '{"error": "Worker child failed"}'
+        return data.decode()
+
+    def serve(self, stdin: Optional[TextIO] = None, stdout: Optional[TextIO] = None):
+        """Answer newline-delimited commands until EOF or 'exit'."""
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        for line in stdin:
+            command = line.strip()
+            if command == "exit":
+                break
+            if not command:
+                continue
+            stdout.write(self.handle(command) + "\n")
+            stdout.flush()
+
+
+def main(argv=None):
+    """Entry point: serve commands on stdin/stdout."""
+    parser = argparse.ArgumentParser(description="Life RPG prefork worker")
+    parser.add_argument("--player", default="Hero", help="Player name for the template engine")
+    parser.add_argument("--instrument", action="store_true", help="Enable engine instrumentation")
+    args = parser.parse_args(argv)
+    PreforkWorker(args.player, instrument=args.instrument).serve()
+
+
+if __name__ == "__main__":
+    main()